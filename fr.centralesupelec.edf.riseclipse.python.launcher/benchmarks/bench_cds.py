@@ -0,0 +1,82 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Measures the startup time of the validator with and without a class data sharing archive.
+
+It is skipped (with a zero exit code) when no JDK 13 or later is found, or when the ``jar`` file is missing.
+
+Usage: python bench_cds.py [jar file] [number of runs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'riseclipse'))
+
+from riseclipse_validator_scl import RiseClipseValidatorSCL
+
+
+def best_time(validator: RiseClipseValidatorSCL, runs: int) -> float:
+    """
+    Returns the shortest time taken to display the help of the validator, in seconds.
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        validator.run(["--help"])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    validator = RiseClipseValidatorSCL()
+    if len(sys.argv) > 1:
+        validator.set_jar_file(sys.argv[1])
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    if not os.path.isfile(validator.jar_file):
+        print("Skipped: jar file not found: " + validator.jar_file)
+        sys.exit(0)
+    if validator.java_command is None:
+        print("Skipped: java not found")
+        sys.exit(0)
+    java_version = validator.get_java_version()
+    if java_version is None or java_version < 13:
+        print("Skipped: a JDK 13 or later is needed")
+        sys.exit(0)
+
+    plain = best_time(validator, runs)
+
+    with tempfile.TemporaryDirectory() as directory:
+        validator.set_class_data_sharing(directory)
+        start = time.perf_counter()
+        validator.run(["--help"])
+        dump = time.perf_counter() - start
+        if not os.path.exists(validator.get_class_data_archive()):
+            print("The archive was not created")
+            sys.exit(1)
+        shared = best_time(validator, runs)
+
+    print("Without archive:      %.0f ms" % (plain * 1000))
+    print("Creating the archive: %.0f ms" % (dump * 1000))
+    print("With archive:         %.0f ms (%.0f%% saved)" % (shared * 1000, 100 * (plain - shared) / plain))
@@ -0,0 +1,73 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Measures the cold import time of ``riseclipse_validator_scl`` with ``python -X importtime``
+and fails if it is above the budget or if an optional heavy dependency is imported.
+
+Usage: python bench_import.py [budget in milliseconds] [number of runs]
+"""
+
+import os
+import subprocess
+import sys
+
+RISECLIPSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'riseclipse')
+
+MODULE = "riseclipse_validator_scl"
+
+# Must only be imported when the feature needing them is used
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "asyncio", "urllib.request")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Imports the module in a new interpreter and returns the cumulative import time
+    of each imported module, in microseconds.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                            cwd=RISECLIPSE_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+if __name__ == '__main__':
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 100.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    best = None
+    for _ in range(runs):
+        times = import_times(MODULE)
+        heavy = [name for name in times if name in HEAVY_MODULES]
+        if heavy:
+            print("Heavy modules imported at startup: " + ", ".join(heavy))
+            sys.exit(1)
+        elapsed = times[MODULE] / 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    print("Import of %s: %.1f ms (budget %.1f ms)" % (MODULE, best, budget))
+    if best > budget:
+        print("Cold startup regressed")
+        sys.exit(1)
@@ -0,0 +1,116 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Compares the parser with the previous implementation of ``parse_message()`` on a large
+synthetic output, checking that both give the same result, then compares the memory used
+by the parsed messages.
+
+Usage: python bench_parser.py [number of lines]
+"""
+
+import os
+import re
+import sys
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'riseclipse'))
+
+from riseclipse_parser import RiseClipseParser
+
+
+def legacy_parse_message(message: str) -> dict:
+    """
+    The implementation of ``RiseClipseParser.parse_message()`` before the precompiled pattern.
+    """
+    parsed_message = {}
+    parsed_message["message"] = message
+    regex_end = r'\((\w|\W)*\)'
+    regex_middle = r'\[(\w|\W)*\]'
+    match = re.search(regex_end, message)
+    filename = match[0].strip()[1:-1].split(":")[0]
+    line = match[0].strip()[1:-1].split(":")[1]
+    message = re.sub(regex_end, '', message)
+    match = re.search(regex_middle, message)
+    category = match[0].strip()[1:-1]
+    message = re.sub(regex_middle, '', message)
+    severity = message[:8].strip()
+    data = message[9:].strip()
+    parsed_message["category"] = category
+    parsed_message["line"] = line
+    parsed_message["data"] = data
+    parsed_message["filename"] = filename
+    parsed_message["severity"] = severity
+    return parsed_message
+
+
+def make_output(count: int) -> str:
+    severities = ["ERROR", "WARNING", "NOTICE", "INFO"]
+    categories = ["OCL", "NSD validation", "SCL parser", "Explicit links"]
+    lines = []
+    for i in range(count):
+        lines.append("%-8s: [%s] DataObject \"Beh\" in LNode \"XCBR%d\" has an unexpected value for attribute stVal (ICD_%d.icd:%d)"
+                     % (severities[i % 4], categories[i % 3], i % 97, i % 13, i))
+    return '\n'.join(lines) + '\n'
+
+
+def timed(label: str, function) -> float:
+    start = perf_counter()
+    result = function()
+    elapsed = perf_counter() - start
+    print("%-28s %8.3f s" % (label, elapsed))
+    return elapsed, result
+
+
+def memory_per_message(function, lines: list[str]) -> float:
+    """
+    Returns the memory allocated by function(lines) for each line, the lines themselves are not counted.
+    """
+    tracemalloc.start()
+    result = function(lines)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / len(lines)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    output = make_output(count)
+    lines = output.split('\n')
+    parser = RiseClipseParser()
+    print("Parsing %d lines" % count)
+
+    legacy_time, legacy = timed("legacy parse_message()", lambda: [legacy_parse_message(l) for l in lines if len(l) > 0])
+    line_time, by_line = timed("parse_message()", lambda: list(parser.iter_parse(lines)))
+    buffer_time, by_buffer = timed("iter_parse_buffer()", lambda: list(parser.iter_parse_buffer(output)))
+
+    if legacy != by_line or legacy != by_buffer:
+        print("Results differ from the legacy implementation")
+        sys.exit(1)
+    print("Same results, speedup: %.1fx per line, %.1fx on the buffer"
+          % (legacy_time / line_time, legacy_time / buffer_time))
+
+    del legacy, by_line, by_buffer
+    sample = [l for l in lines[:100_000] if len(l) > 0]
+    legacy_size = memory_per_message(lambda ls: [legacy_parse_message(l) for l in ls], sample)
+    size = memory_per_message(lambda ls: list(parser.iter_parse(ls)), sample)
+    print("Memory per message: %.0f bytes with dictionaries, %.0f bytes with RiseClipseMessage (%.1fx less)"
+          % (legacy_size, size, legacy_size / size))
@@ -0,0 +1,365 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Benchmarks of the parser, the queries and exports of ``RiseClipseOutput``, and the execution
+of the validator, compared with stored baselines. It runs offline, without a JDK: messages come
+from ``synthetic_output.py`` and the validator is replaced by ``fake_java``.
+
+Times are divided by the time of a fixed pure Python workload, measured between benchmarks,
+so that baselines recorded on one machine can be used on another one. A benchmark slower than
+its baseline by more than the threshold is measured again, with more runs, and fails if it is
+still too slow.
+
+Usage: python bench_suite.py [--messages N] [--repeat N] [--threshold RATIO] [--only NAME] [--update]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from time import perf_counter
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', 'riseclipse'))
+
+from java_worker_pool import JavaWorkerPool
+from riseclipse_output import RiseClipseOutput
+from riseclipse_parser import RiseClipseParser
+from riseclipse_query import RiseClipseQuery
+from riseclipse_validator_scl import RiseClipseValidatorSCL
+from synthetic_output import generate_output, write_output
+
+BASELINES_FILE = os.path.join(BENCHMARKS_DIR, "baselines.json")
+
+FAKE_JAVA = os.path.join(BENCHMARKS_DIR, "fake_java")
+
+# Validations done by each benchmark of the runner, and messages displayed by each of them
+RUNNER_VALIDATIONS = 20
+RUNNER_MESSAGES = 2000
+
+# Benchmarks by name; each one is a generator function which prepares its data, yields the
+# function that is timed, then cleans up
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    BENCHMARKS[function.__name__[len("bench_"):]] = function
+    return function
+
+
+class Data:
+    """
+    The data shared by benchmarks, built once.
+    """
+
+    def __init__(self, messages: int, directory: str):
+        self.directory = directory
+        self.buffer = generate_output(messages, irregular=0.01)
+        self.lines = self.buffer.split('\n')
+        self.baseline_lines = generate_output(messages, irregular=0.01, seed=1).split('\n')
+        self.output_file = os.path.join(directory, "output.txt")
+        write_output(self.output_file, messages, irregular=0.01)
+        self.runner_output_file = os.path.join(directory, "runner_output.txt")
+        write_output(self.runner_output_file, RUNNER_MESSAGES)
+        # the pool reads the main class in the manifest
+        self.jar_file = os.path.join(directory, "RiseClipseValidatorSCL.jar")
+        with zipfile.ZipFile(self.jar_file, "w") as jar:
+            jar.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\nMain-Class: fake.Main\n"
+                                                 "Implementation-Version: 1.2.7\n")
+
+    def make_validator(self) -> RiseClipseValidatorSCL:
+        validator = RiseClipseValidatorSCL()
+        validator.set_java_command(FAKE_JAVA)
+        validator.set_jar_file(self.jar_file)
+        validator.add_file("ICD_test.icd")
+        return validator
+
+
+@benchmark
+def bench_parse_lines(data: Data):
+    parser = RiseClipseParser()
+    yield lambda: list(parser.iter_parse(data.lines))
+
+
+@benchmark
+def bench_parse_buffer(data: Data):
+    parser = RiseClipseParser()
+    yield lambda: list(parser.iter_parse_buffer(data.buffer))
+
+
+@benchmark
+def bench_output_eager(data: Data):
+    yield lambda: RiseClipseOutput(data.lines)
+
+
+@benchmark
+def bench_output_lazy_errors(data: Data):
+    yield lambda: RiseClipseOutput(data.lines, lazy=True).get_errors()
+
+
+@benchmark
+def bench_file_lazy_errors(data: Data):
+    def run():
+        output = RiseClipseOutput.from_file(data.output_file)
+        output.get_errors()
+        output.parsed_messages.close()
+    yield run
+
+
+@benchmark
+def bench_query_severity(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: (output.get_errors(), output.get_warnings(), output.get_only_notices())
+
+
+@benchmark
+def bench_query_filter(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: output.get_messages_with_filter({"severity": "WARNING", "filename": "IED_007.icd",
+                                                   "category": "NSD"})
+
+
+@benchmark
+def bench_query_keyword(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: [output.get_messages_by_keyword(keyword) for keyword in ("XCBR1", "Address", "stVal")]
+
+
+@benchmark
+def bench_query_compiled(data: Data):
+    output = RiseClipseOutput(data.lines)
+    query = RiseClipseQuery(min_severity="NOTICE", filename="IED_01*.icd", category_prefix="NSD",
+                            data_pattern=r"LNode \"\w+1\"")
+    yield lambda: query.count(output, group_by=("filename", "severity"))
+
+
+@benchmark
+def bench_summary(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: output.summarize().to_dict()
+
+
+@benchmark
+def bench_diff(data: Data):
+    output = RiseClipseOutput(data.lines)
+    baseline = RiseClipseOutput(data.baseline_lines)
+    yield lambda: output.diff(baseline)
+
+
+@benchmark
+def bench_export_csv(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: output.write_csv(os.path.join(data.directory, "export.csv"))
+
+
+@benchmark
+def bench_export_json_lines(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: output.write_json_lines(os.path.join(data.directory, "export.jsonl"))
+
+
+@benchmark
+def bench_export_json(data: Data):
+    output = RiseClipseOutput(data.lines)
+    yield lambda: output.to_json(os.path.join(data.directory, "export.json"))
+
+
+@benchmark
+def bench_export_dataframe(data: Data):
+    try:
+        import pandas
+    except ImportError:
+        # skipped
+        return
+    output = RiseClipseOutput(data.lines)
+    # pandas imports more modules on first use
+    RiseClipseOutput(data.lines[:10]).to_dataframe()
+    yield lambda: output.to_dataframe()
+
+
+@benchmark
+def bench_runner_validate(data: Data):
+    validator = data.make_validator()
+    yield lambda: [validator.validate() for _ in range(RUNNER_VALIDATIONS)]
+
+
+@benchmark
+def bench_runner_validate_iter(data: Data):
+    validator = data.make_validator()
+    yield lambda: [list(validator.validate_iter()) for _ in range(RUNNER_VALIDATIONS)]
+
+
+@benchmark
+def bench_runner_validate_to_txt(data: Data):
+    validator = data.make_validator()
+    path = os.path.join(data.directory, "validate.txt")
+    yield lambda: [validator.validate_to_txt(path) for _ in range(RUNNER_VALIDATIONS)]
+
+
+@benchmark
+def bench_runner_batch(data: Data):
+    validator = data.make_validator()
+    files = ["IED_%03d.icd" % i for i in range(RUNNER_VALIDATIONS)]
+    yield lambda: validator.validate_batch(files, workers=4)
+
+
+@benchmark
+def bench_runner_async(data: Data):
+    validators = [data.make_validator() for _ in range(RUNNER_VALIDATIONS)]
+
+    async def run():
+        semaphore = asyncio.Semaphore(4)
+        for validator in validators:
+            validator.set_semaphore(semaphore)
+        await asyncio.gather(*(validator.validate_async() for validator in validators))
+    yield lambda: asyncio.run(run())
+
+
+@benchmark
+def bench_runner_pool(data: Data):
+    validator = data.make_validator()
+    pool = JavaWorkerPool(size=2)
+    validator.set_worker_pool(pool)
+    # the worker is started before timing
+    validator.validate()
+    yield lambda: [validator.validate() for _ in range(RUNNER_VALIDATIONS)]
+    pool.close()
+
+
+def calibrate(repeat: int) -> float:
+    """
+    Returns the shortest time taken by a fixed pure Python workload, in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        counts = {}
+        for i in range(300_000):
+            key = "k%d" % (i % 1000)
+            counts[key] = counts.get(key, 0) + len(key.upper())
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(function, data: Data, repeat: int) -> float:
+    """
+    Returns the shortest time taken by the benchmark, in seconds, or None if it is skipped.
+    """
+    best = None
+    for _ in range(repeat):
+        steps = function(data)
+        timed = next(steps, None)
+        if timed is None:
+            return None
+        # like timeit, collections of the garbage of other benchmarks are avoided
+        gc.collect()
+        gc.disable()
+        try:
+            start = perf_counter()
+            timed()
+            elapsed = perf_counter() - start
+        finally:
+            gc.enable()
+        next(steps, None)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Runs the benchmarks and compares them with the baselines.")
+    parser.add_argument("--messages", type=int, default=100_000, help="number of messages of the synthetic output")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of each benchmark, the best one is kept")
+    parser.add_argument("--threshold", type=float, default=1.5, help="highest accepted ratio to the baseline")
+    parser.add_argument("--latency", type=float, default=0.0, help="startup time of the fake JVM, in seconds")
+    parser.add_argument("--only", help="only run the benchmarks whose name contains this text")
+    parser.add_argument("--update", action="store_true", help="store the results as the new baselines")
+    args = parser.parse_args()
+
+    # inherited by the fake JVMs
+    os.environ["RISECLIPSE_FAKE_LATENCY"] = str(args.latency)
+    os.environ.pop("RISECLIPSE_FAKE_RESULT", None)
+    os.environ.pop("RISECLIPSE_FAKE_KILL", None)
+
+    baselines = {}
+    if os.path.exists(BASELINES_FILE):
+        with open(BASELINES_FILE, encoding="utf-8") as f:
+            baselines = json.load(f)
+    settings = {"messages": args.messages, "latency": args.latency}
+    compare = baselines.get("settings") == settings and not args.update
+    if baselines and not compare and not args.update:
+        print("Baselines were recorded with %s, results are not compared" % baselines.get("settings"))
+
+    def is_too_slow(name: str) -> bool:
+        baseline = baselines.get("results", {}).get(name) if compare else None
+        return baseline is not None and times[name] is not None \
+            and times[name] / calibration / baseline > args.threshold
+
+    times = {}
+    with tempfile.TemporaryDirectory() as directory:
+        data = Data(args.messages, directory)
+        os.environ["RISECLIPSE_FAKE_OUTPUT"] = data.runner_output_file
+        # enough runs for a good estimate, even if few benchmarks are run
+        calibration = calibrate(max(10, args.repeat))
+        for name, function in BENCHMARKS.items():
+            if args.only is not None and args.only not in name:
+                continue
+            times[name] = run_benchmark(function, data, args.repeat)
+            # the machine may be slower for a while
+            calibration = min(calibration, calibrate(1))
+        # a single slow measure is not enough to fail
+        for name in [name for name in times if is_too_slow(name)]:
+            times[name] = min(times[name], run_benchmark(BENCHMARKS[name], data, 2 * args.repeat))
+            calibration = min(calibration, calibrate(1))
+
+    print("Calibration: %.1f ms" % (calibration * 1000))
+    print("%-24s %10s %10s %8s" % ("benchmark", "time (ms)", "baseline", "ratio"))
+    results = {}
+    regressions = []
+    for name, elapsed in times.items():
+        if elapsed is None:
+            print("%-24s %10s" % (name, "skipped"))
+            continue
+        results[name] = elapsed / calibration
+        baseline = baselines.get("results", {}).get(name) if compare else None
+        if baseline is None:
+            print("%-24s %10.1f" % (name, elapsed * 1000))
+            continue
+        ratio = results[name] / baseline
+        print("%-24s %10.1f %10.1f %7.2fx" % (name, elapsed * 1000, baseline * calibration * 1000, ratio))
+        if ratio > args.threshold:
+            regressions.append(name)
+
+    if args.update:
+        if baselines.get("settings") == settings:
+            # benchmarks not run keep their baseline
+            results = dict(baselines.get("results", {}), **results)
+        with open(BASELINES_FILE, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Baselines stored in " + BASELINES_FILE)
+    if regressions:
+        print("Slower than the baseline by more than %.0f%%: %s" % ((args.threshold - 1) * 100, ", ".join(regressions)))
+        sys.exit(1)
@@ -0,0 +1,118 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Generates an output in the format of the validator, of the given size and mix of severities.
+The same arguments always give the same output.
+
+Usage: python synthetic_output.py <number of messages> [--mix ERROR=1,WARNING=3,...] [--files N]
+                                  [--irregular FRACTION] [--seed N] [--output PATH]
+"""
+
+import argparse
+import random
+import sys
+from typing import Iterator
+
+# Relative number of messages of each severity
+DEFAULT_MIX = {"ERROR": 1, "WARNING": 3, "NOTICE": 4, "INFO": 2}
+
+CATEGORIES = ("OCL", "NSD validation", "SCL parser", "Explicit links", "XSD validation")
+
+TEMPLATES = (
+    'DataObject "Beh" in LNode "XCBR{n}" has an unexpected value for attribute stVal',
+    'LNodeType "LLN0_{n}" is not used',
+    'DataAttribute "q" of DO "Pos" in LNode "CSWI{n}" has no value',
+    'FCDA ldInst=LD{n} lnClass=MMXU does not match any DataAttribute',
+    'ConnectedAP of IED "IED_{n}" has no Address',
+    'Unknown LNClass GGIO{n}: the NSD files don\'t define it',
+)
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    """
+    Returns the mix given as ``SEVERITY=WEIGHT,...``, for example ``ERROR=1,WARNING=3``.
+    """
+    mix = {}
+    for item in text.split(","):
+        severity, _, weight = item.partition("=")
+        mix[severity.strip().upper()] = int(weight) if weight else 1
+    return mix
+
+
+def generate_lines(count: int, mix: dict[str, int]=DEFAULT_MIX, files: int=20,
+                   irregular: float=0.0, seed: int=0) -> Iterator[str]:
+    """
+    Yields ``count`` messages, without their newline.
+
+    Args:
+        count: The number of messages.
+        mix: The relative number of messages of each severity.
+        files: The number of distinct filenames.
+        irregular: The fraction of messages with the category after the location,
+            which the parser handles on a slower path.
+        seed: The seed of the random generator.
+    """
+    generator = random.Random(seed)
+    severities = generator.choices(list(mix), weights=list(mix.values()), k=count)
+    for severity in severities:
+        category = CATEGORIES[generator.randrange(len(CATEGORIES))]
+        data = TEMPLATES[generator.randrange(len(TEMPLATES))].format(n=generator.randrange(100))
+        filename = "IED_%03d.icd" % generator.randrange(files)
+        line = generator.randrange(1, 50000)
+        if irregular > 0 and generator.random() < irregular:
+            yield "%-8s: %s (%s:%d) [%s]" % (severity, data, filename, line, category)
+        else:
+            yield "%-8s: [%s] %s (%s:%d)" % (severity, category, data, filename, line)
+
+
+def generate_output(count: int, **options) -> str:
+    """
+    Returns ``count`` messages as displayed by the validator on stdout, see :py:func:`generate_lines` for the options.
+    """
+    return "".join(line + "\n" for line in generate_lines(count, **options))
+
+
+def write_output(path: str, count: int, **options) -> int:
+    """
+    Writes ``count`` messages to a file, see :py:func:`generate_lines` for the options.
+
+    Returns:
+        The size of the file in bytes.
+    """
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for line in generate_lines(count, **options):
+            f.write(line + "\n")
+        return f.tell()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generates a synthetic output of the validator.")
+    parser.add_argument("count", type=int, help="number of messages")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="relative number of messages of each severity")
+    parser.add_argument("--files", type=int, default=20, help="number of distinct filenames")
+    parser.add_argument("--irregular", type=float, default=0.0, help="fraction of messages with the category last")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    parser.add_argument("--output", help="file written, stdout if not given")
+    args = parser.parse_args()
+    options = dict(mix=args.mix, files=args.files, irregular=args.irregular, seed=args.seed)
+    if args.output is None:
+        sys.stdout.writelines(line + "\n" for line in generate_lines(args.count, **options))
+    else:
+        write_output(args.output, args.count, **options)
@@ -0,0 +1,121 @@
+/*
+*************************************************************************
+**  Copyright (c) 2024 CentraleSupélec & EDF.
+**  All rights reserved. This program and the accompanying materials
+**  are made available under the terms of the Eclipse Public License v2.0
+**  which accompanies this distribution, and is available at
+**  https://www.eclipse.org/legal/epl-v20.html
+**
+**  This file is part of the RiseClipse tool
+**
+**  Contributors:
+**      Computer Science Department, CentraleSupélec
+**      EDF R&D
+**  Contacts:
+**      dominique.marcadet@centralesupelec.fr
+**      aurelie.dehouck-neveu@edf.fr
+**  Web site:
+**      https://riseclipse.github.io
+*************************************************************************
+*/
+
+import java.io.BufferedReader;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.security.Permission;
+
+/**
+ * Long-lived worker used by ``java_worker_pool.py``.
+ *
+ * It is launched in source-file mode with the validator jar in the class path:
+ *
+ *     java -cp RiseClipseValidatorSCL.jar RiseClipseWorker.java <main class of the jar>
+ *
+ * Each line read on stdin is a job: its tab-separated fields are the arguments given
+ * to the main method of the jar. The output of the job is written on stdout and is
+ * followed by the end marker and the result code of the job.
+ * A line containing only the ping marker is answered with the pong marker.
+ */
+@SuppressWarnings( "removal" )
+public class RiseClipseWorker {
+
+    private static final String END_MARKER  = "\u001eRISECLIPSE-WORKER-END ";
+    private static final String PING_MARKER = "\u001eRISECLIPSE-WORKER-PING";
+    private static final String PONG_MARKER = "\u001eRISECLIPSE-WORKER-PONG";
+
+    private static volatile boolean exiting = false;
+
+    /**
+     * Thrown instead of exiting the JVM when a job calls System.exit().
+     */
+    private static class ExitTrapped extends SecurityException {
+        private static final long serialVersionUID = 1L;
+        final int status;
+
+        ExitTrapped( int status ) {
+            this.status = status;
+        }
+    }
+
+    private static void trapExit() {
+        try {
+            System.setSecurityManager( new SecurityManager() {
+                @Override
+                public void checkPermission( Permission perm ) {
+                }
+
+                @Override
+                public void checkPermission( Permission perm, Object context ) {
+                }
+
+                @Override
+                public void checkExit( int status ) {
+                    if( ! exiting ) throw new ExitTrapped( status );
+                }
+            });
+        }
+        catch( UnsupportedOperationException | SecurityException e ) {
+            // Not available with this JDK: a job calling System.exit() ends the worker,
+            // the pool will then start a new one.
+        }
+    }
+
+    public static void main( String[] args ) throws Exception {
+        Method main = Class.forName( args[0] ).getMethod( "main", String[].class );
+        PrintStream out = System.out;
+        BufferedReader in = new BufferedReader( new InputStreamReader( System.in, StandardCharsets.UTF_8 ));
+        trapExit();
+
+        String line;
+        while(( line = in.readLine() ) != null ) {
+            if( line.equals( PING_MARKER )) {
+                out.println( PONG_MARKER );
+                out.flush();
+                continue;
+            }
+            String[] jobArguments = line.isEmpty() ? new String[0] : line.split( "\t", -1 );
+            int resultCode = 0;
+            try {
+                main.invoke( null, ( Object ) jobArguments );
+            }
+            catch( InvocationTargetException e ) {
+                if( e.getCause() instanceof ExitTrapped ) {
+                    resultCode = (( ExitTrapped ) e.getCause() ).status;
+                }
+                else {
+                    e.getCause().printStackTrace();
+                    resultCode = 1;
+                }
+            }
+            System.out.flush();
+            System.setOut( out );
+            out.println( END_MARKER + resultCode );
+            out.flush();
+        }
+        exiting = true;
+        System.exit( 0 );
+    }
+}
@@ -0,0 +1,146 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import time
+from typing import TYPE_CHECKING
+
+from java_runner import JavaRunner
+
+if TYPE_CHECKING:
+    # asyncio is only imported when an asynchronous execution is done
+    import asyncio
+
+
+class AsyncJavaRunner(JavaRunner):
+    """
+    Class that carry out the execution of a ``jar`` file without blocking the ``asyncio`` event loop.
+
+    Example:
+        Run many validations with at most 50 JVMs at the same time::
+
+            semaphore = asyncio.Semaphore(50)
+            for validator in validators:
+                validator.set_semaphore(semaphore)
+            outputs = await asyncio.gather(*(v.validate_async(timeout=600) for v in validators))
+
+    Cancelling a task awaiting :py:meth:`run_async`, or reaching its timeout, kills the JVM.
+
+    Note:
+        The worker pool (see :py:meth:`~java_runner.JavaRunner.set_worker_pool`) is not used by
+        :py:meth:`run_async`, each execution starts its own JVM.
+
+    Attributes:
+        semaphore (None or asyncio.Semaphore): The semaphore limiting the number of concurrent executions.
+    """
+
+    def __init__(self, jar_path: str):
+        """
+        Initialize the AsyncJavaRunner object.
+
+        Args:
+            jar_path: The path to the ``jar`` file.
+        """
+        super().__init__(jar_path)
+        self.semaphore = None
+
+    def set_semaphore(self, semaphore: "asyncio.Semaphore") -> None:
+        """
+        Set the semaphore that must be acquired by :py:meth:`run_async` before starting the JVM.
+        The same semaphore can be given to several runners to limit the number of JVMs running at the same time.
+
+        Args:
+            semaphore: The semaphore, or None for no limit.
+        """
+        self.semaphore = semaphore
+
+    def get_semaphore(self) -> "asyncio.Semaphore":
+        """
+        Returns the semaphore limiting the number of concurrent executions.
+
+        Returns:
+            The semaphore or None.
+        """
+        return self.semaphore
+
+    async def run_async(self, arguments: list[str], timeout: float=None, metrics: "RiseClipseMetrics"=None) -> str:
+        """
+        Executes the ``jar`` file using the current ``java`` command and the given arguments.
+
+        Args:
+            arguments: The arguments that are added to the command line.
+            timeout: The maximum duration of the execution in seconds, None for no limit.
+                The time spent waiting for the semaphore is not counted.
+            metrics: The :py:class:`~riseclipse_metrics.RiseClipseMetrics` to which the measures
+                of the execution are added, if any. The resources used by the JVM are not known,
+                the event loop waits for its end.
+
+        Raises:
+            TimeoutError: If the execution lasted more than ``timeout``, the JVM is killed.
+
+        Returns:
+            The text displayed on stdout while the ``jar`` executes.
+        """
+        stdout, self.result_code = await self._execute_async(arguments, timeout, metrics)
+        return stdout
+
+    async def _execute_async(self, arguments: list[str], timeout: float=None,
+                             metrics: "RiseClipseMetrics"=None) -> tuple[str, int]:
+        """
+        Executes the ``jar`` file like :py:meth:`run_async` without changing the result code of this object.
+
+        Note:
+            This method is intended to be internal
+
+        Args:
+            arguments: The arguments that are added to the command line.
+            timeout: The maximum duration of the execution in seconds, None for no limit.
+            metrics: The measures of the execution are added to it, if not None.
+
+        Returns:
+            The text displayed on stdout while the ``jar`` executes and the result code.
+        """
+        if self.semaphore is None:
+            return await self._spawn_async(arguments, timeout, metrics)
+        async with self.semaphore:
+            return await self._spawn_async(arguments, timeout, metrics)
+
+    async def _spawn_async(self, arguments: list[str], timeout: float,
+                           metrics: "RiseClipseMetrics") -> tuple[str, int]:
+        import asyncio
+        from asyncio.subprocess import PIPE, DEVNULL
+        command = self._compute_command(arguments)
+        start = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(*command, stdout=PIPE, stderr=DEVNULL)
+        spawn_time = time.perf_counter() - start
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except BaseException as e:
+            # cancelled or timed out
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            if isinstance(e, asyncio.TimeoutError) and not isinstance(e, TimeoutError):
+                # before Python 3.11, asyncio has its own exception
+                raise TimeoutError("The execution lasted more than " + str(timeout) + " seconds") from e
+            raise
+        self._publish_cds_archive(command)
+        if metrics is not None:
+            metrics.add_process(spawn_time)
+            metrics.add_stdout(len(stdout))
+        return self._decode(stdout), process.returncode
@@ -17,18 +17,68 @@
 # **      https://riseclipse.github.io
 # *************************************************************************
 
+import hashlib
+import os
+import re
+import sys
+import time
 from abc import ABC
-from subprocess import run
+from itertools import count
+from locale import getpreferredencoding
+from pathlib import Path
+from subprocess import run, Popen, PIPE, DEVNULL
 from shutil import which
+from typing import Generator, Iterator
+
+# Options of the JVM for each profile
+JVM_PROFILES = {
+    # short validations: no optimizing compiler, the simplest GC
+    "fast-startup": ["-XX:TieredStopAtLevel=1", "-XX:+UseSerialGC"],
+    # big SCD files: GC with the best throughput, using all processors
+    "throughput": ["-XX:+UseParallelGC"],
+    # many JVMs at the same time: small footprint, memory given back to the system
+    "low-memory": ["-XX:+UseSerialGC", "-XX:TieredStopAtLevel=1", "-XX:MinHeapFreeRatio=10", "-XX:MaxHeapFreeRatio=20"],
+}
+
+DEFAULT_CDS_DIRECTORY = str(Path.home() / ".cache" / "riseclipse" / "cds")
+
+# Warnings of the JVM, about an unusable archive for example, must not be mixed with messages
+_CDS_LOG_OPTIONS = ["-Xlog:disable", "-Xlog:all=warning:stderr"]
+
+# (major version, hash of "java -version") of java commands, by (path, modification time)
+_java_versions = {}
+
+# Hashes of the content and location of jar files, by (path, size, modification time)
+_jar_hashes = {}
+
+# Numbers making the names of archives being created unique
+_temporary_numbers = count()
 
 class JavaRunner(ABC):
     """
     Abstract class that carry out the execution of a ``jar`` file.
     
+    Options can be given to the JVM, either through a named profile (see :py:data:`JVM_PROFILES`),
+    or one by one; they are used by all executions, including those of a worker pool.
+    
+    Example:
+        Validate a big SCD file::
+        
+            validator.set_jvm_profile("throughput")
+            validator.set_heap_size(maximum="8g")
+    
     Attributes:
         java_command (str): The path to the ``java`` command used to execute the jar file.
         jar_file (str): The path to the ``jar`` file that will be executed.
         result_code (None or int): The result code after execution of the ``jar`` file.
+        worker_pool (None or JavaWorkerPool): The pool of long-lived JVMs used to execute the ``jar`` file,
+            a new JVM is started for each execution if None.
+        jvm_profile (None or str): The name of the profile of the JVM.
+        garbage_collector (None or str): The garbage collector of the JVM, such as ``"G1"`` or ``"Parallel"``.
+        max_heap (None or str): The maximum size of the heap, such as ``"4g"``.
+        initial_heap (None or str): The initial size of the heap, such as ``"512m"``.
+        jvm_options (list[str]): Other options given to the JVM.
+        cds_directory (None or str): The directory of class data sharing archives, None if they are not used.
     """
         
     def __init__(self, jar_path: str):
@@ -44,6 +94,13 @@ class JavaRunner(ABC):
         self.jar_file = jar_path
         self.java_command = which("java")
         self.result_code = None
+        self.worker_pool = None
+        self.jvm_profile = None
+        self.garbage_collector = None
+        self.max_heap = None
+        self.initial_heap = None
+        self.jvm_options = []
+        self.cds_directory = None
     
     def set_jar_file(self, jar_path: str) -> None:
         """
@@ -63,6 +120,156 @@ class JavaRunner(ABC):
         """
         self.java_command = command
     
+    def set_worker_pool(self, pool: "JavaWorkerPool") -> None:
+        """
+        Use a pool of long-lived JVMs to execute the ``jar`` file instead of starting
+        a new JVM each time. The pool is not used if it does not support the ``java`` command,
+        see :py:meth:`~java_worker_pool.JavaWorkerPool.is_supported`.
+
+        Args:
+            pool: The :py:class:`~java_worker_pool.JavaWorkerPool` to use, or None to start a new JVM each time.
+        """
+        self.worker_pool = pool
+
+    def get_worker_pool(self) -> "JavaWorkerPool":
+        """
+        Returns the pool of long-lived JVMs used to execute the ``jar`` file.
+
+        Returns:
+            The pool or None.
+        """
+        return self.worker_pool
+
+    def set_jvm_profile(self, profile: str) -> None:
+        """
+        Use the options of the given profile for the JVM. Options given by other methods are kept,
+        and take precedence.
+
+        Args:
+            profile: ``"fast-startup"``, ``"throughput"``, ``"low-memory"`` (see :py:data:`JVM_PROFILES`), or None for no profile.
+
+        Raises:
+            ValueError: If the profile is unknown.
+        """
+        if profile is not None and profile not in JVM_PROFILES:
+            raise ValueError("Unknown JVM profile: " + profile)
+        self.jvm_profile = profile
+
+    def get_jvm_profile(self) -> str:
+        """
+        Returns the name of the profile of the JVM.
+
+        Returns:
+            The name of the profile or None.
+        """
+        return self.jvm_profile
+
+    def set_garbage_collector(self, name: str) -> None:
+        """
+        Change the garbage collector of the JVM, it replaces the one of the profile.
+
+        Args:
+            name: The name of the collector as in ``-XX:+Use<name>GC``: ``"Serial"``, ``"Parallel"``,
+                ``"G1"``, ``"Z"``, ``"Shenandoah"``..., or None for the one of the profile or of the JVM.
+        """
+        self.garbage_collector = name
+
+    def set_heap_size(self, maximum: str=None, initial: str=None) -> None:
+        """
+        Change the size of the heap of the JVM (``-Xmx`` and ``-Xms``).
+
+        Args:
+            maximum: The maximum size, such as ``"4g"``, None for the default of the JVM.
+            initial: The initial size, such as ``"512m"``, None for the default of the JVM.
+        """
+        self.max_heap = maximum
+        self.initial_heap = initial
+
+    def set_jvm_options(self, options: list[str]) -> None:
+        """
+        Replace the other options given to the JVM.
+
+        Args:
+            options: The options, such as ``["-XX:+UseStringDeduplication"]``.
+        """
+        self.jvm_options = list(options)
+
+    def add_jvm_option(self, option: str) -> None:
+        """
+        Add an option given to the JVM.
+
+        Args:
+            option: The option, such as ``"-XX:ActiveProcessorCount=2"``.
+        """
+        self.jvm_options.append(option)
+
+    def get_jvm_options(self) -> list[str]:
+        """
+        Returns all the options given to the JVM: those of the profile, then the garbage collector,
+        the heap sizes and the other options.
+
+        Returns:
+            The list of options.
+        """
+        options = []
+        if self.jvm_profile is not None:
+            for option in JVM_PROFILES[self.jvm_profile]:
+                # two garbage collectors can't be selected
+                if self.garbage_collector is None or not (option.startswith("-XX:+Use") and option.endswith("GC")):
+                    options.append(option)
+        if self.garbage_collector is not None:
+            options.append("-XX:+Use" + self.garbage_collector + "GC")
+        if self.initial_heap is not None:
+            options.append("-Xms" + self.initial_heap)
+        if self.max_heap is not None:
+            options.append("-Xmx" + self.max_heap)
+        return options + self.jvm_options
+
+    def set_class_data_sharing(self, directory: str=DEFAULT_CDS_DIRECTORY) -> None:
+        """
+        Use an application class data sharing (AppCDS) archive to start the JVM faster.
+        
+        The first execution creates the archive of the classes it loads (``-XX:ArchiveClassesAtExit``),
+        the following ones start with it (``-XX:SharedArchiveFile``). There is one archive for each
+        ``jar`` file (content, path and modification time) and ``java`` version, so a new one is created
+        when one of them changes. Warnings of the JVM are then written on stderr instead of stdout.
+        A JDK 13 or later is needed, nothing is done with an older one.
+        
+        Note:
+            The worker pool does not use the archive, its workers are started once.
+
+        Args:
+            directory: The directory where archives are stored, None to stop using them.
+        """
+        self.cds_directory = directory
+
+    def get_class_data_archive(self) -> str:
+        """
+        Returns the path of the class data sharing archive of the current ``jar`` file and ``java`` command,
+        the archive may not exist yet.
+
+        Returns:
+            The path, or None if class data sharing is not used or not supported by the ``java`` command.
+        """
+        if self.cds_directory is None:
+            return None
+        java_version = self._get_java_version()
+        jar_hash = self._get_jar_hash()
+        if java_version is None or java_version[0] < 13 or jar_hash is None:
+            return None
+        return os.path.join(self.cds_directory, jar_hash[:32] + "-" + java_version[1][:16] + ".jsa")
+
+    def get_java_version(self) -> int:
+        """
+        Returns the major version of the current ``java`` command, such as 17, found by running
+        ``java -version`` once for each command.
+
+        Returns:
+            The major version, or None if it can't be found.
+        """
+        java_version = self._get_java_version()
+        return None if java_version is None else java_version[0]
+
     def get_result_code(self) -> int:
         """
         Returns the result code after execution of the ``jar`` file.
@@ -73,19 +280,296 @@ class JavaRunner(ABC):
         """
         return self.result_code
     
-    def run(self, arguments: list[str]) -> str:
+    def run(self, arguments: list[str], metrics: "RiseClipseMetrics"=None) -> str:
         """
         Executes the ``jar`` file using the current ``java`` command and the given arguments.
         
         Args:
             arguments: The arguments that are added to the command line.
+            metrics: The :py:class:`~riseclipse_metrics.RiseClipseMetrics` to which the measures
+                of the execution are added, if any.
 
         Returns:
             The text displayed on stdout while the ``jar`` executes.
         """
-        command = [self.java_command, '-jar', self.jar_file] + [a for a in arguments]
-        result = run(command, capture_output=True, text=True)
-        self.result_code = result.returncode
+        stdout, self.result_code = self._execute(arguments, metrics)
+        return stdout
 
-        return result.stdout
+    def run_iter(self, arguments: list[str], metrics: "RiseClipseMetrics"=None) -> Iterator[str]:
+        """
+        Executes the ``jar`` file using the current ``java`` command and the given arguments.
+        The lines displayed on stdout are yielded while the ``jar`` executes.
+        
+        The result code is available when all lines have been read.
+        If the iteration is stopped before, the execution of the ``jar`` is stopped.
+        
+        Args:
+            arguments: The arguments that are added to the command line.
+            metrics: The :py:class:`~riseclipse_metrics.RiseClipseMetrics` to which the measures
+                of the execution are added, if any.
+
+        Returns:
+            An iterator over the lines displayed on stdout, without their newline.
+        """
+        lines = self._execute_iter(arguments, metrics)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration as end:
+                self.result_code = end.value
+                return
+            yield line[:-1] if line.endswith('\n') else line
+
+    def run_to_file(self, arguments: list[str], path: str, metrics: "RiseClipseMetrics"=None) -> None:
+        """
+        Executes the ``jar`` file using the current ``java`` command and the given arguments.
+        What is displayed on stdout is written to the given file by the JVM itself,
+        it does not go through Python.
+        
+        Args:
+            arguments: The arguments that are added to the command line.
+            path: The path of the file, it is overwritten.
+            metrics: The :py:class:`~riseclipse_metrics.RiseClipseMetrics` to which the measures
+                of the execution are added, if any.
+        """
+        self.result_code = self._execute_to_file(arguments, path, metrics)
+
+    def _compute_command(self, arguments: list[str]) -> list[str]:
+        """
+        Returns the command line executing the ``jar`` file with the given arguments.
+
+        Note:
+            This method is intended to be internal
+        """
+        return [self.java_command] + self.get_jvm_options() + self._get_cds_options() \
+            + ['-jar', self.jar_file] + [a for a in arguments]
+
+    def _get_cds_options(self) -> list[str]:
+        """
+        Returns the options using the class data sharing archive, or creating it if it does not exist.
+        """
+        archive = self.get_class_data_archive()
+        if archive is None:
+            return []
+        if os.path.exists(archive):
+            return _CDS_LOG_OPTIONS + ["-XX:SharedArchiveFile=" + archive]
+        os.makedirs(self.cds_directory, exist_ok=True)
+        # each JVM writes its own file, the first to end publishes it
+        temporary = "%s.%d.%d.tmp" % (archive, os.getpid(), next(_temporary_numbers))
+        return _CDS_LOG_OPTIONS + ["-XX:ArchiveClassesAtExit=" + temporary]
+
+    def _publish_cds_archive(self, command: list[str]) -> None:
+        """
+        Moves the archive created by the execution of the given command to its final place.
+        """
+        for option in command:
+            if option.startswith("-XX:ArchiveClassesAtExit="):
+                temporary = option[len("-XX:ArchiveClassesAtExit="):]
+                try:
+                    os.replace(temporary, temporary[:temporary.rindex(".jsa.") + len(".jsa")])
+                except OSError:
+                    # the JVM was killed before writing it
+                    pass
+                return
+
+    def _use_worker_pool(self) -> bool:
+        """
+        Returns whether the jar file is executed by the worker pool, a new JVM is started otherwise.
+        """
+        return self.worker_pool is not None and self.worker_pool.is_supported(self)
+
+    def _get_java_version(self) -> tuple[int, str]:
+        """
+        Returns the major version of the ``java`` command and a hash of its complete version.
+        """
+        try:
+            identity = (self.java_command, os.stat(self.java_command).st_mtime_ns)
+        except (OSError, TypeError):
+            return None
+        if identity not in _java_versions:
+            version = run([self.java_command, '-version'], capture_output=True, text=True).stderr
+            match = re.search(r'version "(\d+)(?:\.(\d+))?', version)
+            if match is None:
+                _java_versions[identity] = None
+            else:
+                # 1.8 is Java 8
+                major = int(match[2]) if match[1] == "1" and match[2] else int(match[1])
+                _java_versions[identity] = (major, hashlib.sha256(version.encode()).hexdigest())
+        return _java_versions[identity]
+
+    def _get_jar_hash(self) -> str:
+        """
+        Returns a hash of the content of the ``jar`` file and of its path and modification time,
+        which the JVM checks before using an archive.
+        """
+        try:
+            stat = os.stat(self.jar_file)
+        except (OSError, TypeError):
+            return None
+        identity = (os.path.abspath(self.jar_file), stat.st_size, stat.st_mtime_ns)
+        if identity not in _jar_hashes:
+            digest = hashlib.sha256(repr(identity).encode())
+            with open(self.jar_file, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    digest.update(chunk)
+            _jar_hashes[identity] = digest.hexdigest()
+        return _jar_hashes[identity]
+
+    def _execute_to_file(self, arguments: list[str], path: str, metrics: "RiseClipseMetrics"=None) -> int:
+        """
+        Executes the ``jar`` file like :py:meth:`run_to_file` without changing the result code of this object.
+
+        Note:
+            This method is intended to be internal
+
+        Args:
+            arguments: The arguments that are added to the command line.
+            path: The path of the file, it is overwritten.
+            metrics: The measures of the execution are added to it, if not None.
+
+        Returns:
+            The result code.
+        """
+        if self._use_worker_pool():
+            # the output of a worker is shared by its jobs, it can't be redirected
+            lines = self.worker_pool.iter_run(self, arguments)
+            with open(path, "w") as f:
+                while True:
+                    try:
+                        f.write(next(lines))
+                    except StopIteration as end:
+                        result_code = end.value
+                        break
+        else:
+            command = self._compute_command(arguments)
+            with open(path, "wb") as f:
+                start = time.perf_counter()
+                with Popen(command, stdout=f, stderr=DEVNULL) as process:
+                    try:
+                        result_code = self._wait(process, time.perf_counter() - start, metrics)
+                    except BaseException:
+                        process.kill()
+                        raise
+            self._publish_cds_archive(command)
+        if metrics is not None:
+            metrics.add_stdout(os.path.getsize(path))
+        return result_code
+
+    def _execute(self, arguments: list[str], metrics: "RiseClipseMetrics"=None) -> tuple[str, int]:
+        """
+        Executes the ``jar`` file like :py:meth:`run` without changing the result code of this object,
+        so that several executions may be done concurrently.
+
+        Note:
+            This method is intended to be internal
+
+        Args:
+            arguments: The arguments that are added to the command line.
+            metrics: The measures of the execution are added to it, if not None.
+
+        Returns:
+            The text displayed on stdout while the ``jar`` executes and the result code.
+        """
+        if self._use_worker_pool():
+            stdout, result_code = self.worker_pool.run(self, arguments)
+            if metrics is not None:
+                metrics.add_stdout(len(stdout.encode(getpreferredencoding(False))))
+            return stdout, result_code
+
+        command = self._compute_command(arguments)
+        start = time.perf_counter()
+        with Popen(command, stdout=PIPE, stderr=DEVNULL) as process:
+            spawn_time = time.perf_counter() - start
+            try:
+                stdout = process.stdout.read()
+                result_code = self._wait(process, spawn_time, metrics)
+            except BaseException:
+                process.kill()
+                raise
+        self._publish_cds_archive(command)
+        if metrics is not None:
+            metrics.add_stdout(len(stdout))
+
+        return self._decode(stdout), result_code
+
+    def _execute_iter(self, arguments: list[str], metrics: "RiseClipseMetrics"=None) -> Generator[str, None, int]:
+        """
+        Executes the ``jar`` file like :py:meth:`run_iter` without changing the result code of this object.
+
+        Note:
+            This method is intended to be internal
+
+        Args:
+            arguments: The arguments that are added to the command line.
+            metrics: The measures of the execution are added to it, if not None.
+
+        Returns:
+            A generator of lines, ending with their newline, its return value is the result code.
+        """
+        encoding = getpreferredencoding(False)
+        size = 0
+        if self._use_worker_pool():
+            lines = self.worker_pool.iter_run(self, arguments)
+            try:
+                while True:
+                    try:
+                        line = next(lines)
+                    except StopIteration as end:
+                        result_code = end.value
+                        break
+                    size += len(line.encode(encoding))
+                    yield line
+            finally:
+                # stops the job if the iteration is stopped
+                lines.close()
+                if metrics is not None:
+                    metrics.add_stdout(size)
+            return result_code
+
+        command = self._compute_command(arguments)
+        start = time.perf_counter()
+        with Popen(command, stdout=PIPE, stderr=DEVNULL) as process:
+            spawn_time = time.perf_counter() - start
+            done = False
+            try:
+                for line in process.stdout:
+                    size += len(line)
+                    line = line.decode(encoding)
+                    # same newlines as a text stream
+                    yield line[:-2] + '\n' if line.endswith('\r\n') else line
+                done = True
+            finally:
+                if not done:
+                    process.kill()
+                # also measured when the iteration is stopped
+                result_code = self._wait(process, spawn_time, metrics)
+                if metrics is not None:
+                    metrics.add_stdout(size)
+        self._publish_cds_archive(command)
+        return result_code
+
+    def _wait(self, process: Popen, spawn_time: float, metrics: "RiseClipseMetrics"=None) -> int:
+        """
+        Waits for the end of the JVM and returns its result code. The time taken to start it
+        and the resources it used are added to the metrics, if not None.
+        """
+        if not hasattr(os, "wait4"):
+            # Windows: the resources used by a child are not known
+            process.wait()
+            cpu_time = peak_rss = None
+        else:
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            cpu_time = usage.ru_utime + usage.ru_stime
+            # in kilobytes, except on macOS
+            peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        if metrics is not None:
+            metrics.add_process(spawn_time, cpu_time, peak_rss)
+        return process.returncode
+
+    def _decode(self, stdout: bytes) -> str:
+        """
+        Decodes what the JVM displayed on stdout, like ``subprocess.run(text=True)``.
+        """
+        return stdout.decode(getpreferredencoding(False)).replace('\r\n', '\n').replace('\r', '\n')
 
@@ -0,0 +1,386 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+from pathlib import Path
+from queue import Queue, Empty
+from subprocess import Popen, PIPE, DEVNULL
+from threading import Condition, Thread
+from typing import Generator
+from zipfile import ZipFile
+
+
+WORKER_SOURCE = str(Path(__file__).with_name("RiseClipseWorker.java"))
+
+END_MARKER  = "\x1eRISECLIPSE-WORKER-END "
+PING_MARKER = "\x1eRISECLIPSE-WORKER-PING"
+PONG_MARKER = "\x1eRISECLIPSE-WORKER-PONG"
+
+
+class JavaWorker:
+    """
+    A long-lived JVM executing ``RiseClipseWorker.java`` with a ``jar`` file in its class path.
+
+    Jobs are sent on the stdin of the process, one line per job, and their output is read
+    on its stdout until the end marker is found.
+
+    Attributes:
+        command (list[str]): The command used to start the worker.
+        jobs (int): The number of jobs executed by this worker.
+    """
+
+    def __init__(self, command: list[str]):
+        """
+        Start the worker.
+
+        Args:
+            command: The command used to start the worker.
+        """
+        self.command = command
+        self.jobs = 0
+        self.process = Popen(command, stdin=PIPE, stdout=PIPE, stderr=DEVNULL, text=True, bufsize=1)
+        # stdout is read by a thread so that health checks can use a timeout
+        self.lines = Queue()
+        self.reader = Thread(target=self._read_stdout, daemon=True)
+        self.reader.start()
+
+    def _read_stdout(self) -> None:
+        """
+        Forward the lines written by the worker to the queue, None is put at the end.
+        """
+        for line in self.process.stdout:
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def is_alive(self) -> bool:
+        """
+        Returns:
+            True if the process of the worker is still running, False otherwise.
+        """
+        return self.process.poll() is None
+
+    def ping(self, timeout: float) -> bool:
+        """
+        Check that the worker answers in the given time.
+
+        Args:
+            timeout: The maximum time to wait for the answer, in seconds.
+
+        Returns:
+            True if the worker is healthy, False otherwise.
+        """
+        if not self._send(PING_MARKER):
+            return False
+        try:
+            line = self.lines.get(timeout=timeout)
+        except Empty:
+            return False
+        return line is not None and line.rstrip('\n') == PONG_MARKER
+
+    def run(self, arguments: list[str]) -> tuple[str, int]:
+        """
+        Execute a job.
+
+        If the job stops the JVM, what was written before is returned with the exit code of the process.
+
+        Args:
+            arguments: The arguments given to the main method of the ``jar``.
+
+        Returns:
+            The text displayed on stdout by the job and its result code.
+        """
+        output = []
+        lines = self.iter_run(arguments)
+        while True:
+            try:
+                output.append(next(lines))
+            except StopIteration as end:
+                return ''.join(output), end.value
+
+    def iter_run(self, arguments: list[str]) -> Generator[str, None, int]:
+        """
+        Execute a job, the lines it displays on stdout are yielded as soon as they are read.
+
+        Args:
+            arguments: The arguments given to the main method of the ``jar``.
+
+        Returns:
+            A generator of lines, ending with their newline, its return value is the result code of the job.
+        """
+        for argument in arguments:
+            if '\t' in argument or '\n' in argument:
+                raise ValueError("Arguments sent to a worker cannot contain tabs or newlines: " + repr(argument))
+        self.jobs += 1
+        if self._send('\t'.join(arguments)):
+            while True:
+                line = self.lines.get()
+                if line is None:
+                    break
+                marker = line.find(END_MARKER)
+                if marker >= 0:
+                    if marker > 0:
+                        yield line[:marker]
+                    return int(line[marker + len(END_MARKER):])
+                yield line
+        return self.process.wait()
+
+    def kill(self) -> None:
+        """
+        Stop the worker immediately, even if a job is running.
+        """
+        self.process.kill()
+        self.process.wait()
+
+    def close(self) -> None:
+        """
+        Stop the worker.
+        """
+        if self.is_alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except Exception:
+                self.process.kill()
+                self.process.wait()
+
+    def _send(self, line: str) -> bool:
+        try:
+            self.process.stdin.write(line + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+        return True
+
+
+class JavaWorkerPool:
+    """
+    A pool of long-lived JVMs used to avoid paying JVM startup, classloading and
+    JIT warm-up for each execution of a ``jar`` file.
+
+    It is used by a :py:class:`~java_runner.JavaRunner` after a call to
+    :py:meth:`~java_runner.JavaRunner.set_worker_pool`::
+
+        pool = JavaWorkerPool(size=4, max_jobs=200)
+        validator.set_worker_pool(pool)
+        out = validator.validate()     # executed by a warm JVM
+        pool.close()
+
+    Workers are started when needed, checked before each job, and replaced after ``max_jobs``
+    jobs or when they stop. The pool can be shared by several runners and used from several threads.
+
+    Note:
+        A JDK from 11 to 23 is needed: ``RiseClipseWorker.java`` is launched with the source-file mode
+        of ``java``, and catches the calls of jobs to ``System.exit()`` with a security manager,
+        which JDK 24 no longer allows. With another JDK, a :py:class:`~java_runner.JavaRunner`
+        using the pool starts a new JVM for each execution, see :py:meth:`is_supported`.
+
+    Attributes:
+        size (int): The maximum number of workers alive at the same time.
+        max_jobs (int): The number of jobs after which a worker is replaced.
+        ping_timeout (float): The time in seconds a worker has to answer a health check.
+    """
+
+    def __init__(self, size: int=2, max_jobs: int=100, ping_timeout: float=60.0):
+        """
+        Initialize the JavaWorkerPool object, no worker is started yet.
+
+        Args:
+            size: The maximum number of workers alive at the same time.
+            max_jobs: The number of jobs after which a worker is replaced.
+            ping_timeout: The time in seconds a worker has to answer a health check.
+        """
+        if size < 1:
+            raise ValueError("The size of the pool must be at least 1")
+        self.size = size
+        self.max_jobs = max_jobs
+        self.ping_timeout = ping_timeout
+        self.idle_workers = []
+        self.busy_count = 0
+        self.condition = Condition()
+        self.main_classes = {}
+
+    def run(self, runner: "JavaRunner", arguments: list[str]) -> tuple[str, int]:
+        """
+        Executes the ``jar`` file of the given runner on a worker.
+
+        Args:
+            runner: The runner giving the ``java`` command and the ``jar`` file.
+            arguments: The arguments that are added to the command line.
+
+        Returns:
+            The text displayed on stdout while the ``jar`` executes and the result code.
+        """
+        worker = self._acquire(self._compute_command(runner))
+        try:
+            return worker.run(arguments)
+        finally:
+            self._release(worker)
+
+    def iter_run(self, runner: "JavaRunner", arguments: list[str]) -> Generator[str, None, int]:
+        """
+        Executes the ``jar`` file of the given runner on a worker, the lines displayed on stdout
+        are yielded as soon as they are read.
+
+        If the generator is closed before the end of the job, the worker is stopped.
+
+        Args:
+            runner: The runner giving the ``java`` command and the ``jar`` file.
+            arguments: The arguments that are added to the command line.
+
+        Returns:
+            A generator of lines, ending with their newline, its return value is the result code.
+        """
+        worker = self._acquire(self._compute_command(runner))
+        done = False
+        try:
+            result_code = yield from worker.iter_run(arguments)
+            done = True
+            return result_code
+        finally:
+            if not done:
+                worker.kill()
+            self._release(worker)
+
+    def is_supported(self, runner: "JavaRunner") -> bool:
+        """
+        Checks that the ``java`` command of the given runner can start workers, which trap the
+        calls of jobs to ``System.exit()``: a JDK from 11 to 23 is needed.
+
+        Args:
+            runner: The runner giving the ``java`` command.
+
+        Returns:
+            True if the pool can execute the ``jar`` file of the runner, False otherwise.
+        """
+        java_version = runner.get_java_version()
+        return java_version is not None and 11 <= java_version <= 23
+
+    def get_worker_count(self) -> int:
+        """
+        Returns:
+            The number of workers currently alive.
+        """
+        with self.condition:
+            return len(self.idle_workers) + self.busy_count
+
+    def close(self) -> None:
+        """
+        Stop all idle workers. Busy workers are stopped when their job is done.
+        """
+        with self.condition:
+            workers = self.idle_workers
+            self.idle_workers = []
+            self.size = 0
+        for worker in workers:
+            worker.close()
+
+    def _compute_command(self, runner: "JavaRunner") -> list[str]:
+        """
+        Returns the command used to start a worker for the given runner.
+        """
+        return [runner.java_command] + runner.get_jvm_options() + self._get_security_options(runner) \
+            + ['-cp', runner.jar_file, WORKER_SOURCE, self._get_main_class(runner.jar_file)]
+
+    def _get_security_options(self, runner: "JavaRunner") -> list[str]:
+        """
+        Returns the options allowing the worker to install its security manager, which traps
+        the calls to ``System.exit()``.
+
+        Raises:
+            RuntimeError: If the ``java`` command of the runner is not supported, see :py:meth:`is_supported`.
+        """
+        if not self.is_supported(runner):
+            raise RuntimeError("A worker pool needs a JDK from 11 to 23, the version of "
+                               + str(runner.java_command) + " is " + str(runner.get_java_version()))
+        # allowed by default before JDK 18, the option is unknown to JDK 11
+        return [] if runner.get_java_version() == 11 else ['-Djava.security.manager=allow']
+
+    def _get_main_class(self, jar_path: str) -> str:
+        """
+        Returns the ``Main-Class`` given in the manifest of the ``jar`` file.
+        """
+        if jar_path not in self.main_classes:
+            with ZipFile(jar_path) as jar:
+                manifest = jar.read("META-INF/MANIFEST.MF").decode("utf-8")
+            # continuation lines start with a single space
+            manifest = manifest.replace("\r\n", "\n").replace("\n ", "")
+            for line in manifest.split('\n'):
+                if line.startswith("Main-Class:"):
+                    self.main_classes[jar_path] = line[len("Main-Class:"):].strip()
+                    break
+            else:
+                raise ValueError("No Main-Class in the manifest of " + jar_path)
+        return self.main_classes[jar_path]
+
+    def _acquire(self, command: list[str]) -> JavaWorker:
+        """
+        Returns a healthy worker started with the given command, waiting for one if needed.
+        """
+        worker = None
+        to_close = None
+        with self.condition:
+            while True:
+                if self.size == 0:
+                    raise RuntimeError("The worker pool is closed")
+                worker = next((w for w in self.idle_workers if w.command == command), None)
+                if worker is not None:
+                    self.idle_workers.remove(worker)
+                    break
+                if len(self.idle_workers) + self.busy_count < self.size:
+                    break
+                if len(self.idle_workers) > 0:
+                    # an idle worker for another jar leaves its place
+                    to_close = self.idle_workers.pop(0)
+                    break
+                self.condition.wait()
+            self.busy_count += 1
+        if to_close is not None:
+            to_close.close()
+        if worker is not None and worker.is_alive() and worker.ping(self.ping_timeout):
+            return worker
+        if worker is not None:
+            worker.close()
+        try:
+            worker = JavaWorker(command)
+        except Exception:
+            self._discard()
+            raise
+        if worker.ping(self.ping_timeout):
+            return worker
+        worker.close()
+        self._discard()
+        raise RuntimeError("Unable to start a worker with command: " + ' '.join(command))
+
+    def _release(self, worker: JavaWorker) -> None:
+        """
+        Give back a worker to the pool, it is stopped if it must be replaced.
+        """
+        keep = worker.is_alive() and worker.jobs < self.max_jobs
+        with self.condition:
+            self.busy_count -= 1
+            if keep and len(self.idle_workers) + self.busy_count < self.size:
+                self.idle_workers.append(worker)
+                worker = None
+            self.condition.notify()
+        if worker is not None:
+            worker.close()
+
+    def _discard(self) -> None:
+        with self.condition:
+            self.busy_count -= 1
+            self.condition.notify()
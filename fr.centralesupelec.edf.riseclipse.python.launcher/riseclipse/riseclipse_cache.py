@@ -0,0 +1,213 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+
+DEFAULT_CACHE_DIRECTORY = str(Path.home() / ".cache" / "riseclipse" / "results")
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class RiseClipseCache:
+    """
+    A persistent cache of validation results, used by :py:meth:`~riseclipse_validator.RiseClipseValidator.validate`
+    after a call to :py:meth:`~riseclipse_validator.RiseClipseValidator.set_cache`.
+
+    A result is found again when the validation is done with the same ``jar`` file, the same arguments,
+    and files and directories given in the arguments (SCL files, NSD and OCL directories, XML Schema...)
+    with the same content. Each entry stores the result code and the parsed messages.
+
+    When the total size of entries is above ``max_size``, the least recently used entries are removed.
+
+    Example:
+        Nightly validations only start Java for files that have changed::
+
+            cache = RiseClipseCache()
+            validator.set_cache(cache)
+            out = validator.validate()
+
+    Attributes:
+        directory (str): The directory where entries are stored.
+        max_size (int): The maximum total size of entries, in bytes.
+    """
+
+    def __init__(self, directory: str=DEFAULT_CACHE_DIRECTORY, max_size: int=512 * 1024 * 1024):
+        """
+        Initialize the RiseClipseCache object, the directory is created if needed.
+
+        Args:
+            directory: The directory where entries are stored.
+            max_size: The maximum total size of entries, in bytes.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        # content hashes already computed, by (path, size, modification time)
+        self.file_hashes = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def compute_key(self, validator: "RiseClipseValidator", arguments: list[str]) -> str:
+        """
+        Returns the key of the validation done by the given validator with the given arguments.
+
+        Args:
+            validator: The validator, its ``jar`` file is part of the key.
+            arguments: The arguments given to the validator, their values and the content of
+                those which are paths to existing files or directories are part of the key.
+
+        Returns:
+            The key, an hexadecimal string.
+        """
+        key = hashlib.sha256()
+        key.update(b"jar\0" + self._hash_path(validator.jar_file).encode() + b"\0")
+        for argument in arguments:
+            key.update(b"arg\0" + argument.encode() + b"\0")
+            if os.path.exists(argument):
+                key.update(b"content\0" + self._hash_path(argument).encode() + b"\0")
+        return key.hexdigest()
+
+    def get(self, key: str) -> tuple[int, list["RiseClipseMessage"]]:
+        """
+        Returns the entry with the given key, it becomes the most recently used one.
+
+        Args:
+            key: The key of the entry.
+
+        Returns:
+            The result code and the parsed messages, or None if there is no such entry.
+            An entry which can't be loaded (written by another version of this package, or damaged)
+            is removed and None is returned.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # unpickling may raise nearly anything, such as AttributeError or ImportError
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def put(self, key: str, result_code: int, messages: list["RiseClipseMessage"]) -> None:
+        """
+        Stores an entry, least recently used entries are removed if the cache is too big.
+
+        Args:
+            key: The key of the entry.
+            result_code: The result code of the validation.
+            messages: The parsed messages of the validation.
+        """
+        # written in a temporary file first so that a concurrent get() never sees a partial entry
+        with NamedTemporaryFile("wb", dir=self.directory, suffix=".tmp", delete=False) as f:
+            pickle.dump((result_code, list(messages)), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, self._entry_path(key))
+        self._evict()
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Removes the entry with the given key.
+
+        Args:
+            key: The key of the entry, see :py:meth:`compute_key`.
+
+        Returns:
+            True if there was such an entry, False otherwise.
+        """
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        for entry in Path(self.directory).glob("*.pickle"):
+            entry.unlink(missing_ok=True)
+        self.file_hashes.clear()
+
+    def get_size(self) -> int:
+        """
+        Returns:
+            The total size of entries, in bytes.
+        """
+        return sum(entry.stat().st_size for entry in Path(self.directory).glob("*.pickle"))
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pickle")
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used entries until the total size is below ``max_size``.
+        """
+        entries = []
+        total = 0
+        for entry in Path(self.directory).glob("*.pickle"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+            total += stat.st_size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+    def _hash_path(self, path: str) -> str:
+        """
+        Returns the hash of the content of a file, or of the names and contents of all files in a directory.
+        """
+        if not os.path.isdir(path):
+            return self._hash_file(path)
+        digest = hashlib.sha256()
+        for root, directories, files in os.walk(path):
+            directories.sort()
+            for name in sorted(files):
+                file = os.path.join(root, name)
+                digest.update(os.path.relpath(file, path).encode() + b"\0")
+                digest.update(self._hash_file(file).encode() + b"\0")
+        return digest.hexdigest()
+
+    def _hash_file(self, path: str) -> str:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return "missing"
+        identity = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if identity not in self.file_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                while chunk := f.read(HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+            self.file_hashes[identity] = digest.hexdigest()
+        return self.file_hashes[identity]
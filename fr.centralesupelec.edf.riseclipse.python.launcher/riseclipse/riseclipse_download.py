@@ -17,20 +17,62 @@
 # **      https://riseclipse.github.io
 # *************************************************************************
 
-from urllib.request import urlopen, urlretrieve
+import hashlib
+import json
+import os
+from time import sleep
+from typing import Callable
+from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
+from http.client import HTTPException
+
+
+GITHUB_URL = 'https://github.com/riseclipse/'
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class RiseClipseDownload:
 
     """
     This class is used to download RiseClipse validator ``jar`` files.
+    
+    Attributes:
+        base_url (str): The URL of the organisation hosting the repositories, ending with ``/``.
+        retries (int): The number of times a failed download is tried again.
+        backoff (float): The delay before the first retry in seconds, it is doubled for each following retry.
+        timeout (float): The timeout of network operations in seconds.
+        metadata (None or RiseClipseMetadataCache): The cache of latest versions used by :py:meth:`get_latest_version`.
     """
 
+    def __init__(self, base_url: str=GITHUB_URL, retries: int=5, backoff: float=1.0, timeout: float=60.0,
+                 metadata: "RiseClipseMetadataCache"=None):
+        """
+        Initialize the RiseClipseDownload object.
+        
+        Args:
+            base_url: The URL of the organisation hosting the repositories, ending with ``/``.
+                It can be changed to use a mirror or a local server.
+            retries: The number of times a failed download is tried again.
+            backoff: The delay before the first retry in seconds, it is doubled for each following retry.
+            timeout: The timeout of network operations in seconds.
+            metadata: The cache of latest versions, None to always ask the server.
+        """
+        self.base_url = base_url
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.metadata = metadata
+
     def get_latest_version(self, repository: str) -> list[int]:
         """
         Get the latest version of the tool in the given repository of `RiseClipse organisation`_
         on GitHub.
         
+        With a metadata cache, a version checked less than its ``ttl`` ago is returned without
+        using the network; an older one is revalidated with the ``ETag`` of the page, and is still
+        returned if the server cannot be reached.
+        
         .. _RiseClipse organisation:
             https://github.com/riseclipse
         
@@ -46,17 +88,38 @@ class RiseClipseDownload:
         Returns:
             A list of three integers giving the latest version.
         """
-        url = 'https://github.com/riseclipse/' + repository + '/releases/latest'
+        cached = None if self.metadata is None else self.metadata.get_release(repository)
+        if cached is not None and cached[2]:
+            return cached[0]
+        
+        url = self.base_url + repository + '/releases/latest'
+        request = Request(url)
+        if cached is not None and cached[1] is not None:
+            request.add_header('If-None-Match', cached[1])
         page = None
         try:
-            page = urlopen(url)
+            page = urlopen(request, timeout=self.timeout)
         except HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self.metadata.put_release(repository, cached[0], cached[1])
+                return cached[0]
             print('Getting ', url, ' failed, error code: ', e.code)
-            return None
-        except URLError as e:
-            print('Getting ', url, ' failed, reason: ', e.reason)
-            return None
+            return None if cached is None else cached[0]
+        except (URLError, OSError) as e:
+            print('Getting ', url, ' failed, reason: ', getattr(e, 'reason', e))
+            return None if cached is None else cached[0]
         
+        with page:
+            version = self._parse_release_page(page, repository)
+            etag = page.headers.get('ETag')
+        if version is not None and self.metadata is not None:
+            self.metadata.put_release(repository, version, etag)
+        return version
+    
+    def _parse_release_page(self, page, repository: str) -> list[int]:
+        """
+        Reads the version in the title of the release page.
+        """
         title = None
         for line in page:
             line = line.lstrip().decode("utf-8")
@@ -77,11 +140,22 @@ class RiseClipseDownload:
             version[i] = int(version[i])
         return version
 
-    def download_version(self, repository : str, name: str, version: list[int], output: str) -> None:
+    def download_version(self, repository : str, name: str, version: list[int], output: str,
+                         sha256: str=None, progress: Callable[[int, int], None]=None) -> bool:
         """
         Download the ``jar`` of the tool in the given repository of `RiseClipse organisation`_
         on GitHub, with the given name and version, put it in the file with the given path.
         
+        The file is downloaded in chunks to ``output + ".part"``. If the download is interrupted, it is
+        tried again after a delay, resuming where it stopped when the server supports HTTP ranges;
+        the delay doubles after each failure. The URL and the ``ETag`` (or ``Last-Modified``) of the
+        file are kept in ``output + ".part.json"``: a partial file is only resumed for the same URL,
+        with an ``If-Range`` header so that the server sends the whole file again if it has changed.
+        The complete file is checked against ``sha256`` when given, then moved to ``output``:
+        an existing ``output`` is never left half written. If the server does not give the size
+        of the file, it can't be known to be complete without ``sha256``: the download fails
+        and the partial file is kept.
+        
         .. _RiseClipse organisation:
             https://github.com/riseclipse
         
@@ -96,16 +170,138 @@ class RiseClipseDownload:
             name: the name of the ``jar`` file without the version number.
             version: the requested version.
             output: the path where the ``jar`` will be saved.
+            sha256: the expected SHA-256 of the ``jar`` as an hexadecimal string, not checked if None.
+            progress: called with the number of bytes received and the total size (None if unknown)
+                after each chunk.
+        
+        Returns:
+            True if the ``jar`` has been saved, False otherwise.
         """
         version = '%d.%d.%d' % (version[0], version[1], version[2])
-        url = 'https://github.com/riseclipse/' + repository + '/releases/download/'
+        url = self.base_url + repository + '/releases/download/'
         url = url + repository + '-' + version + '/' + name + '-' + version + '.jar'
+        partial = output + '.part'
+        
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                complete = self._download_chunks(url, partial, progress)
+                if complete is None or complete:
+                    break
+            except HTTPError as e:
+                print('Downloading ', url, ' failed, error code: ', e.code)
+                if e.code < 500 and e.code != 429:
+                    return False
+            except URLError as e:
+                print('Downloading ', url, ' failed, reason: ', e.reason)
+            except (HTTPException, OSError) as e:
+                print('Downloading ', url, ' failed, reason: ', e)
+        else:
+            return False
+        
+        if complete is None and sha256 is None:
+            print('Downloading ', url, ' failed, the size of the file is unknown, its SHA-256 is needed to check it')
+            return False
+        if sha256 is not None:
+            digest = hashlib.sha256()
+            with open(partial, 'rb') as f:
+                while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+            if digest.hexdigest() != sha256.lower():
+                print('Downloading ', url, ' failed, SHA-256 mismatch: ', digest.hexdigest())
+                self._remove_partial(partial)
+                return False
+        os.replace(partial, output)
+        self._remove_partial(partial)
+        return True
+    
+    def _download_chunks(self, url: str, partial: str, progress: Callable[[int, int], None]) -> bool:
+        """
+        Appends to the partial file what is missing, asking the server for the remaining bytes.
+        
+        A partial file is only resumed if it was received from the same URL, and the server is asked
+        to send the whole file if it has changed since (``If-Range``). Otherwise, or if the server
+        refuses the range, the partial file is removed and the download starts from zero.
+        
+        Returns:
+            True if the file is complete, False if the connection ended too early,
+            None if the server did not give the size of the file.
+        """
+        validator = self._read_partial_info(partial, url)
+        if validator is None:
+            self._remove_partial(partial)
+        received = os.path.getsize(partial) if os.path.exists(partial) else 0
+        request = Request(url)
+        if received > 0:
+            request.add_header('Range', 'bytes=%d-' % received)
+            request.add_header('If-Range', validator)
         try:
-            urlretrieve(url, output)
+            response = urlopen(request, timeout=self.timeout)
         except HTTPError as e:
-            print('Downloading ', url, ' failed, error code: ', e.code)
-        except URLError as e:
-            print('Downloading ', url, ' failed, reason: ', e.reason)
+            if e.code == 416 and received > 0:
+                # the partial file is not a prefix of the file on the server
+                self._remove_partial(partial)
+                return self._download_chunks(url, partial, progress)
+            raise
+        with response:
+            if response.status != 206 or not self._is_range_from(response, received):
+                # the server sends the whole file
+                received = 0
+            if received == 0:
+                validator = response.headers.get('ETag')
+                if validator is None or validator.startswith('W/'):
+                    # a weak ETag can't be used in If-Range
+                    validator = response.headers.get('Last-Modified')
+                self._write_partial_info(partial, url, validator)
+            length = response.headers.get('Content-Length')
+            total = None if length is None else received + int(length)
+            with open(partial, 'ab' if received > 0 else 'wb') as f:
+                while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    received += len(chunk)
+                    if progress is not None:
+                        progress(received, total)
+        return None if total is None else received >= total
+    
+    def _is_range_from(self, response, start: int) -> bool:
+        """
+        Checks that the ``Content-Range`` of a partial response starts at the given byte.
+        """
+        content_range = response.headers.get('Content-Range', '')
+        return content_range.startswith('bytes %d-' % start)
+    
+    def _read_partial_info(self, partial: str, url: str) -> str:
+        """
+        Returns the ``ETag`` or ``Last-Modified`` of the partial file if it can be resumed
+        from the given URL, None otherwise.
+        """
+        if not os.path.exists(partial):
+            return None
+        try:
+            with open(partial + '.json', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(info, dict) or info.get('url') != url:
+            return None
+        validator = info.get('validator')
+        return validator if isinstance(validator, str) and validator != '' else None
+    
+    def _write_partial_info(self, partial: str, url: str, validator: str) -> None:
+        """
+        Keeps what is needed to resume the partial file, it won't be resumed without a validator.
+        """
+        with open(partial + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'validator': validator}, f)
+    
+    def _remove_partial(self, partial: str) -> None:
+        """
+        Removes the partial file and what is kept about it.
+        """
+        for path in (partial, partial + '.json'):
+            if os.path.exists(path):
+                os.remove(path)
     
 
 #r = RiseClipseDownload()
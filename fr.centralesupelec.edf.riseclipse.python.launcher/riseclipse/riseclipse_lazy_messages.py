@@ -0,0 +1,147 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+from collections.abc import Sequence
+from sys import intern
+from typing import Iterable, Iterator
+
+from riseclipse_message import SEVERITY_LEVELS, RiseClipseMessage
+from riseclipse_parser import RiseClipseParser
+
+
+class RiseClipseLazyMessages(Sequence):
+    """
+    Messages of the validator kept as lines of text, each one is parsed the first time it is
+    accessed, then remembered.
+
+    The severity of a message can be known without parsing it: the validator writes it on the
+    first 8 characters of the line, padded with spaces. The message is parsed when these characters
+    are not one of :py:data:`~riseclipse_message.SEVERITY_LEVELS` padded with spaces, so the severity
+    of a message is the one the parser gives. For a line which is not a message, a severity may
+    be given although accessing the message raises ``ValueError``.
+
+    It is used by :py:class:`~riseclipse_output.RiseClipseOutput` created with ``lazy=True``.
+
+    Note:
+        Like when messages are parsed at once, a line that is not a message raises ``ValueError``,
+        but only when it is accessed.
+    """
+
+    def __init__(self, lines: Iterable[str]=()):
+        """
+        Keeps the non-empty lines.
+
+        Args:
+            lines: The lines displayed by the validator.
+        """
+        self.lines = [line for line in lines if len(line) > 0]
+        self.parser = RiseClipseParser()
+        self.messages = [None] * len(self.lines)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        message = self.messages[index]
+        if message is None:
+            message = self.parser.parse_message(self.get_line(index))
+            self.messages[index] = message
+        return message
+
+    def __iter__(self) -> Iterator[RiseClipseMessage]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_line(self, index: int) -> str:
+        """
+        Returns the line of the message at the given position, without parsing it.
+
+        Args:
+            index: The position of the message.
+
+        Returns:
+            The non-parsed message.
+        """
+        return self.lines[index]
+
+    def get_severity(self, index: int) -> str:
+        """
+        Returns the severity of the message at the given position, the message is only parsed
+        if its severity can't be read from the beginning of its line.
+
+        Args:
+            index: The position of the message.
+
+        Returns:
+            The severity of the message.
+        """
+        message = self.messages[index]
+        if message is not None:
+            return message.severity
+        prefix = self._get_prefix(index)
+        severity = None if prefix is None else self._read_severity(prefix)
+        if severity is None:
+            return self[index].severity
+        return severity
+
+    def iter_severities(self) -> Iterator[str]:
+        """
+        Returns the severities of all messages, like :py:meth:`get_severity` but faster.
+
+        Returns:
+            An iterator over the severities of the messages, in their order.
+        """
+        messages = self.messages
+        # the same few prefixes are found on most lines
+        severities = {None: None}
+        for index, prefix in enumerate(self._iter_prefixes()):
+            message = messages[index]
+            if message is not None:
+                yield message.severity
+                continue
+            if prefix in severities:
+                severity = severities[prefix]
+            else:
+                severity = severities[prefix] = self._read_severity(prefix)
+            yield self[index].severity if severity is None else severity
+
+    def _read_severity(self, prefix: str) -> str:
+        """
+        Returns the severity written on the first 8 characters of a line, or None if they are
+        not a known severity padded with spaces.
+        """
+        severity = prefix.strip()
+        if len(prefix) < 8 or severity not in SEVERITY_LEVELS:
+            return None
+        return intern(severity)
+
+    def _get_prefix(self, index: int) -> str:
+        """
+        Returns the first 8 characters of the line, or None if they can't be read without parsing it.
+        """
+        return self.lines[index][:8]
+
+    def _iter_prefixes(self) -> Iterator[str]:
+        """
+        Returns the result of :py:meth:`_get_prefix` for all lines.
+        """
+        for line in self.lines:
+            yield line[:8]
@@ -0,0 +1,107 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+from collections.abc import Mapping
+from sys import intern
+from typing import Iterator
+
+
+FIELDS = ("message", "category", "line", "data", "filename", "severity")
+
+# From the lowest to the highest severity
+SEVERITY_LEVELS = ("DEBUG", "INFO", "NOTICE", "WARNING", "ERROR")
+
+
+class RiseClipseMessage(Mapping):
+    """
+    A parsed message of the validator, stored compactly.
+
+    Category, filename and severity are interned so that all messages share the same few strings,
+    the line number is stored as an integer, and ``data``, which is usually a part of ``message``,
+    is stored as a slice of it.
+
+    It is also a read-only mapping with the same keys as the dictionaries previously returned by
+    :py:meth:`~riseclipse_parser.RiseClipseParser.parse_message` (``message``, ``category``, ``line``,
+    ``data``, ``filename`` and ``severity``), so ``message["severity"]`` still works, ``message["line"]``
+    gives the line number as a string, and ``dict(message)`` gives the previous dictionary.
+
+    Attributes:
+        message (str): The original non-parsed message.
+        category (str): The category of the message.
+        line (int or str): The line number in the file targetted by the message, a string if it is not a number.
+        filename (str): The name of the file targetted by the message.
+        severity (str): The severity of the message.
+    """
+
+    __slots__ = ("message", "category", "line", "_data", "filename", "severity")
+
+    def __init__(self, message: str, category: str, line: str, data: str, filename: str, severity: str):
+        """
+        Initialize the RiseClipseMessage object.
+
+        Args:
+            message: The original non-parsed message.
+            category: The category of the message.
+            line: The line number, as written in the message.
+            data: The part of the message that contains the actual error/warning/notice/info.
+            filename: The name of the file targetted by the message.
+            severity: The severity of the message.
+        """
+        self.message = message
+        self.category = intern(category)
+        self.line = int(line) if line.isascii() and line.isdigit() and str(int(line)) == line else line
+        start = message.find(data)
+        self._data = data if start < 0 else (start, start + len(data))
+        self.filename = intern(filename)
+        self.severity = intern(severity)
+
+    @property
+    def data(self) -> str:
+        """
+        The part of the message that contains the actual error/warning/notice/info.
+        """
+        if isinstance(self._data, str):
+            return self._data
+        return self.message[self._data[0]:self._data[1]]
+
+    def __getitem__(self, key: str):
+        if key == "line":
+            return str(self.line)
+        if key in FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return (RiseClipseMessage, (self.message, self.category, str(self.line), self.data, self.filename, self.severity))
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            The message as a dictionary with keys ``message``, ``category``, ``line``, ``data``, ``filename`` and ``severity``.
+        """
+        return dict(self)
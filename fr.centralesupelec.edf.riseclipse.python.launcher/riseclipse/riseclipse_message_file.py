@@ -0,0 +1,125 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import mmap
+from array import array
+from locale import getpreferredencoding
+from typing import Iterator
+
+from riseclipse_lazy_messages import RiseClipseLazyMessages
+from riseclipse_parser import RiseClipseParser
+
+
+class RiseClipseMessageFile(RiseClipseLazyMessages):
+    """
+    The messages of a file saved by :py:meth:`~riseclipse_validator.RiseClipseValidator.validate_to_txt`,
+    read only when they are used.
+
+    The file is memory-mapped and only the positions of its non-empty lines are kept. A message
+    is decoded and parsed the first time it is accessed, then remembered. The severity of a
+    message can be read from the fixed-width prefix of its line without parsing it,
+    see :py:class:`~riseclipse_lazy_messages.RiseClipseLazyMessages`.
+
+    It is used by :py:meth:`~riseclipse_output.RiseClipseOutput.from_file`.
+
+    Attributes:
+        path (str): The path of the file.
+        encoding (str): The encoding of the file.
+    """
+
+    def __init__(self, path: str, encoding: str=None):
+        """
+        Maps the file in memory and finds its lines.
+
+        Args:
+            path: The path of the file.
+            encoding: The encoding of the file, the one used by Java (the preferred encoding of the system) if None.
+        """
+        self.path = path
+        self.encoding = encoding or getpreferredencoding(False)
+        self.parser = RiseClipseParser()
+        with open(path, "rb") as f:
+            if f.seek(0, 2) == 0:
+                # an empty file can't be mapped
+                self.buffer = b""
+            else:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # start and end of each non-empty line, without its newline
+        self.starts = array("q")
+        self.ends = array("q")
+        self._find_lines()
+        self.messages = [None] * len(self.starts)
+
+    def get_line(self, index: int) -> str:
+        """
+        Returns the line of the message at the given position, without parsing it.
+
+        Args:
+            index: The position of the message.
+
+        Returns:
+            The non-parsed message.
+        """
+        return self.buffer[self.starts[index]:self.ends[index]].decode(self.encoding)
+
+    def close(self) -> None:
+        """
+        Unmaps the file, messages not yet accessed can no longer be read.
+        """
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def _get_prefix(self, index: int) -> str:
+        start = self.starts[index]
+        prefix = self.buffer[start:min(start + 8, self.ends[index])]
+        # 8 bytes are 8 characters only in ASCII
+        if not prefix.isascii():
+            return None
+        return prefix.decode("ascii")
+
+    def _iter_prefixes(self) -> Iterator[str]:
+        buffer = self.buffer
+        # prefixes already decoded
+        decoded = {}
+        for start, end in zip(self.starts, self.ends):
+            prefix = buffer[start:min(start + 8, end)]
+            if prefix not in decoded:
+                # 8 bytes are 8 characters only in ASCII
+                if not prefix.isascii():
+                    decoded[prefix] = None
+                else:
+                    decoded[prefix] = prefix.decode("ascii")
+            yield decoded[prefix]
+
+    def _find_lines(self) -> None:
+        buffer = self.buffer
+        size = len(buffer)
+        find = buffer.find
+        starts = self.starts
+        ends = self.ends
+        position = 0
+        while position < size:
+            end = find(b"\n", position)
+            if end < 0:
+                end = size
+            stop = end - 1 if end > position and buffer[end - 1] == 13 else end
+            if stop > position:
+                starts.append(position)
+                ends.append(stop)
+            position = end + 1
@@ -0,0 +1,152 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import json
+import os
+import time
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+
+DEFAULT_METADATA_FILE = str(Path.home() / ".cache" / "riseclipse" / "metadata.json")
+
+
+class RiseClipseMetadataCache:
+    """
+    A small persistent cache of versions, so that checking for updates does not need
+    the network or Java each time.
+
+    It stores:
+
+    * the latest release of each repository, with the time it was checked and the ``ETag``
+      sent by the server; it is fresh for ``ttl`` seconds, then revalidated with ``If-None-Match``
+      by :py:meth:`~riseclipse_download.RiseClipseDownload.get_latest_version`
+    * the version of ``jar`` files, keyed by their path, size and modification time, so that
+      a replaced ``jar`` is detected
+
+    Example:
+        Check for a new version at most once a day::
+
+            metadata = RiseClipseMetadataCache(ttl=24 * 3600)
+            download = RiseClipseDownload(metadata=metadata)
+            latest = download.get_latest_version("riseclipse-validator-scl2003")
+
+    Attributes:
+        path (str): The path of the JSON file where versions are stored.
+        ttl (float): The time during which a release version is used without asking the server, in seconds.
+    """
+
+    def __init__(self, path: str=DEFAULT_METADATA_FILE, ttl: float=24 * 3600):
+        """
+        Initialize the RiseClipseMetadataCache object, the file is read if it exists.
+
+        Args:
+            path: The path of the JSON file where versions are stored.
+            ttl: The time during which a release version is used without asking the server, in seconds.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.content = {"releases": {}, "jars": {}}
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = json.load(f)
+            self.content["releases"].update(content.get("releases", {}))
+            self.content["jars"].update(content.get("jars", {}))
+        except (OSError, ValueError, AttributeError):
+            # missing or damaged file, it will be rewritten
+            pass
+
+    def get_release(self, repository: str) -> tuple[list[int], str, bool]:
+        """
+        Returns the latest release of the given repository known by the cache.
+
+        Args:
+            repository: The repository of the tool.
+
+        Returns:
+            The version, the ``ETag`` (None if unknown) and whether the version is still fresh,
+            or None if the repository is unknown.
+        """
+        release = self.content["releases"].get(repository)
+        if release is None:
+            return None
+        fresh = time.time() - release["checked"] < self.ttl
+        return release["version"], release.get("etag"), fresh
+
+    def put_release(self, repository: str, version: list[int], etag: str=None) -> None:
+        """
+        Stores the latest release of the given repository, checked now.
+
+        Args:
+            repository: The repository of the tool.
+            version: The latest version.
+            etag: The ``ETag`` of the release page, if any.
+        """
+        self.content["releases"][repository] = {"version": list(version), "etag": etag, "checked": time.time()}
+        self._save()
+
+    def get_jar_version(self, jar: str) -> list[int]:
+        """
+        Returns the stored version of the given ``jar`` file, if it has not changed since.
+
+        Args:
+            jar: The path of the ``jar`` file.
+
+        Returns:
+            The version, or None if it is unknown or if the file has changed.
+        """
+        entry = self.content["jars"].get(os.path.abspath(jar))
+        if entry is None or entry["identity"] != self._jar_identity(jar):
+            return None
+        return entry["version"]
+
+    def put_jar_version(self, jar: str, version: list[int]) -> None:
+        """
+        Stores the version of the given ``jar`` file.
+
+        Args:
+            jar: The path of the ``jar`` file.
+            version: Its version.
+        """
+        identity = self._jar_identity(jar)
+        if identity is None:
+            return
+        self.content["jars"][os.path.abspath(jar)] = {"identity": identity, "version": list(version)}
+        self._save()
+
+    def _jar_identity(self, jar: str) -> list[int]:
+        try:
+            stat = os.stat(jar)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _save(self) -> None:
+        """
+        Writes the file, a concurrent reader sees either the previous content or the new one.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                json.dump(self.content, f)
+            os.replace(f.name, self.path)
+        except OSError:
+            # the cache is only an optimisation
+            pass
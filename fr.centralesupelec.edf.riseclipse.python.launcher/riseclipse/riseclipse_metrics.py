@@ -0,0 +1,151 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import time
+from threading import Lock
+
+
+class RiseClipseMetrics:
+    """
+    The measures of one call to a ``validate*()`` method of :py:class:`~riseclipse_validator.RiseClipseValidator`,
+    given to its metrics hooks (see :py:meth:`~riseclipse_validator.RiseClipseValidator.add_metrics_hook`).
+
+    A measure that can't be known is None: the CPU time and peak memory of a JVM are not available
+    on Windows, nor when it is started by :py:meth:`~riseclipse_validator.RiseClipseValidator.validate_async`;
+    nothing is known about the JVMs of a worker pool; messages are not parsed by the methods
+    giving the output as text.
+
+    When several JVMs are started (:py:meth:`~riseclipse_validator.RiseClipseValidator.validate_batch`),
+    spawn and CPU times are added up, the peak memory is the one of the biggest JVM.
+
+    Attributes:
+        method (str): The name of the method, such as ``"validate"``.
+        jar_file (str): The ``jar`` file executed.
+        started (float): When the call started, in seconds since the epoch.
+        result_code (None or int): The result code of the validator, None if it did not end.
+        cached (bool): Whether the result was taken from the cache, without starting any JVM.
+        processes (int): The number of JVMs started.
+        spawn_time (None or float): The time taken to start the JVMs, in seconds.
+        wall_time (None or float): The duration of the call, in seconds; for ``validate_iter``,
+            it includes the time the caller spent on each message.
+        cpu_time (None or float): The user and system CPU time used by the JVMs, in seconds.
+        peak_rss (None or int): The peak resident set size of the JVMs, in bytes.
+        stdout_bytes (int): The number of bytes displayed by the validator on stdout.
+        parse_time (None or float): The time taken to parse the messages, in seconds.
+        severity_counts (None or dict[str, int]): The number of messages of each severity.
+    """
+
+    def __init__(self, method: str, jar_file: str):
+        """
+        Initialize the RiseClipseMetrics object, the call starts now.
+
+        Args:
+            method: The name of the method.
+            jar_file: The ``jar`` file executed.
+        """
+        self.method = method
+        self.jar_file = jar_file
+        self.started = time.time()
+        self.result_code = None
+        self.cached = False
+        self.processes = 0
+        self.spawn_time = None
+        self.wall_time = None
+        self.cpu_time = None
+        self.peak_rss = None
+        self.stdout_bytes = 0
+        self.parse_time = None
+        self.severity_counts = None
+        self.clock = time.perf_counter()
+        # JVMs of a batch end in different threads
+        self.lock = Lock()
+
+    def add_process(self, spawn_time: float, cpu_time: float=None, peak_rss: int=None) -> None:
+        """
+        Adds the measures of a JVM that has ended.
+
+        Args:
+            spawn_time: The time taken to start it, in seconds.
+            cpu_time: The user and system CPU time it used, in seconds, None if unknown.
+            peak_rss: Its peak resident set size, in bytes, None if unknown.
+        """
+        with self.lock:
+            self.processes += 1
+            self.spawn_time = spawn_time + (self.spawn_time or 0.0)
+            if cpu_time is not None:
+                self.cpu_time = cpu_time + (self.cpu_time or 0.0)
+            if peak_rss is not None:
+                self.peak_rss = max(peak_rss, self.peak_rss or 0)
+
+    def add_stdout(self, size: int) -> None:
+        """
+        Adds bytes displayed on stdout.
+
+        Args:
+            size: The number of bytes.
+        """
+        with self.lock:
+            self.stdout_bytes += size
+
+    def set_messages(self, parse_time: float, severity_counts: dict[str, int]) -> None:
+        """
+        Sets the measures of the parsing of messages.
+
+        Args:
+            parse_time: The time taken to parse the messages, in seconds.
+            severity_counts: The number of messages of each severity.
+        """
+        self.parse_time = parse_time
+        self.severity_counts = dict(severity_counts)
+
+    def finish(self, result_code: int) -> None:
+        """
+        Ends the call now.
+
+        Args:
+            result_code: The result code of the validator, None if it did not end.
+        """
+        self.result_code = result_code
+        self.wall_time = time.perf_counter() - self.clock
+
+    def to_dict(self) -> dict:
+        """
+        Returns the measures as a dictionary, which can be serialized to JSON.
+
+        Returns:
+            A dictionary whose keys are the names of the attributes.
+        """
+        return {
+            "method": self.method,
+            "jar_file": self.jar_file,
+            "started": self.started,
+            "result_code": self.result_code,
+            "cached": self.cached,
+            "processes": self.processes,
+            "spawn_time": self.spawn_time,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "stdout_bytes": self.stdout_bytes,
+            "parse_time": self.parse_time,
+            "severity_counts": self.severity_counts,
+        }
+
+    def __repr__(self) -> str:
+        return "RiseClipseMetrics(%r)" % self.to_dict()
@@ -0,0 +1,182 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import json
+import os
+from tempfile import NamedTemporaryFile
+
+from riseclipse_metrics import RiseClipseMetrics
+
+
+# Name, help and attribute of RiseClipseMetrics added up for each method, None to count validations
+_PROMETHEUS_COUNTERS = (
+    ("riseclipse_validations_total", "Number of validations.", None),
+    ("riseclipse_cached_validations_total", "Number of validations whose result was taken from the cache.", "cached"),
+    ("riseclipse_jvm_starts_total", "Number of JVMs started.", "processes"),
+    ("riseclipse_spawn_seconds_total", "Time taken to start JVMs.", "spawn_time"),
+    ("riseclipse_wall_seconds_total", "Duration of validations.", "wall_time"),
+    ("riseclipse_cpu_seconds_total", "User and system CPU time used by JVMs.", "cpu_time"),
+    ("riseclipse_stdout_bytes_total", "Bytes displayed by the validator on stdout.", "stdout_bytes"),
+    ("riseclipse_parse_seconds_total", "Time taken to parse messages.", "parse_time"),
+)
+
+# Name, help and attribute of RiseClipseMetrics of the last validation of each method
+_PROMETHEUS_GAUGES = (
+    ("riseclipse_last_result_code", "Result code of the last validation.", "result_code"),
+    ("riseclipse_last_wall_seconds", "Duration of the last validation.", "wall_time"),
+    ("riseclipse_last_peak_rss_bytes", "Peak resident set size of the JVMs of the last validation.", "peak_rss"),
+    ("riseclipse_last_timestamp_seconds", "Start of the last validation, in seconds since the epoch.", "started"),
+)
+
+
+class RiseClipseMetricsExporter:
+    """
+    A metrics hook (see :py:meth:`~riseclipse_validator.RiseClipseValidator.add_metrics_hook`) writing
+    the measures of validations to a file.
+
+    Two formats are available:
+
+    * ``"jsonl"``: one JSON object per validation (see :py:meth:`~riseclipse_metrics.RiseClipseMetrics.to_dict`)
+      is appended to the file
+    * ``"prometheus"``: the totals of all validations since the exporter was created, and the measures
+      of the last one, labelled by method, in the Prometheus text format; the file is replaced at each
+      validation, so that it can be read at any time by the textfile collector of ``node_exporter``
+
+    Example:
+        Keep a record of each validation::
+
+            with RiseClipseMetricsExporter("metrics.jsonl") as exporter:
+                validator.add_metrics_hook(exporter)
+                out = validator.validate()
+
+    Attributes:
+        path (str): The path of the file.
+        format (str): The format of the file, ``"jsonl"`` or ``"prometheus"``.
+        counters (dict[str, dict[tuple, float]]): For the Prometheus format, the value of each counter by labels.
+        gauges (dict[str, dict[tuple, float]]): For the Prometheus format, the value of each gauge by labels.
+    """
+
+    def __init__(self, path: str, format: str="jsonl"):
+        """
+        Initialize the RiseClipseMetricsExporter object, a JSON Lines file is opened for appending.
+
+        Args:
+            path: The path of the file.
+            format: ``"jsonl"`` or ``"prometheus"``.
+        """
+        if format not in ("jsonl", "prometheus"):
+            raise ValueError("Unknown format: " + format)
+        self.path = path
+        self.format = format
+        self.counters = {}
+        self.gauges = {}
+        self.file = None
+        if format == "jsonl":
+            self.file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, metrics: RiseClipseMetrics) -> None:
+        """
+        Writes the measures of a validation, see :py:meth:`export`.
+        """
+        self.export(metrics)
+
+    def export(self, metrics: RiseClipseMetrics) -> None:
+        """
+        Writes the measures of a validation to the file.
+
+        Args:
+            metrics: The measures.
+        """
+        if self.format == "jsonl":
+            self.file.write(json.dumps(metrics.to_dict()) + "\n")
+            # the record is complete even if the process is killed later
+            self.file.flush()
+            return
+        self.add(metrics)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+            f.write(self.to_prometheus())
+        # a temporary file is only readable by its owner, node_exporter may run as another user
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, self.path)
+
+    def add(self, metrics: RiseClipseMetrics) -> None:
+        """
+        Adds the measures of a validation to the counters and gauges of the Prometheus format,
+        without writing them.
+
+        Args:
+            metrics: The measures.
+        """
+        labels = (("method", metrics.method),)
+        for name, _, attribute in _PROMETHEUS_COUNTERS:
+            value = 1 if attribute is None else getattr(metrics, attribute)
+            values = self.counters.setdefault(name, {})
+            values[labels] = values.get(labels, 0) + (value or 0)
+        for name, _, attribute in _PROMETHEUS_GAUGES:
+            value = getattr(metrics, attribute)
+            if value is not None:
+                self.gauges.setdefault(name, {})[labels] = value
+        values = self.counters.setdefault("riseclipse_messages_total", {})
+        for severity, count in (metrics.severity_counts or {}).items():
+            key = labels + (("severity", severity),)
+            values[key] = values.get(key, 0) + count
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the counters and gauges in the Prometheus text format.
+
+        Returns:
+            The text, which can also be served over HTTP.
+        """
+        helps = {name: (help, "counter") for name, help, _ in _PROMETHEUS_COUNTERS}
+        helps["riseclipse_messages_total"] = ("Number of messages by severity.", "counter")
+        helps.update((name, (help, "gauge")) for name, help, _ in _PROMETHEUS_GAUGES)
+        lines = []
+        for name, values in list(self.counters.items()) + list(self.gauges.items()):
+            if len(values) == 0:
+                continue
+            help, kind = helps[name]
+            lines.append("# HELP %s %s" % (name, help))
+            lines.append("# TYPE %s %s" % (name, kind))
+            for labels, value in sorted(values.items()):
+                lines.append("%s{%s} %s" % (name, ",".join('%s="%s"' % (key, self._escape(label))
+                                                           for key, label in labels), self._format(value)))
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        """
+        Closes the JSON Lines file.
+        """
+        if self.file is not None:
+            self.file.close()
+
+    def __enter__(self) -> "RiseClipseMetricsExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _escape(self, label: str) -> str:
+        return str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def _format(self, value: float) -> str:
+        if isinstance(value, bool) or isinstance(value, int):
+            return str(int(value))
+        return repr(float(value))
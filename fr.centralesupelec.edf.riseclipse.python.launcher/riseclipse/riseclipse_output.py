@@ -17,24 +17,167 @@
 # **      https://riseclipse.github.io
 # *************************************************************************
 
+from riseclipse_lazy_messages import RiseClipseLazyMessages
+from riseclipse_message import RiseClipseMessage, SEVERITY_LEVELS
+from riseclipse_message_file import RiseClipseMessageFile
 from riseclipse_parser import RiseClipseParser
+from riseclipse_summary import RiseClipseSummary
+from riseclipse_writer import RiseClipseWriter, CSV_COLUMNS
+import csv
+import gzip
+import io
 import json
-import pandas as pd
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
 
+if TYPE_CHECKING:
+    # pandas is only imported when a DataFrame is built
+    import pandas as pd
+
+
+# Length of the substrings indexed for substring queries
+NGRAM_SIZE = 3
+
+# Words indexed for keyword queries
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Severities of the messages in each list returned by a getter
+_SEVERITIES_OF_LIST = {
+    "errors": ("ERROR",),
+    "warnings": ("ERROR", "WARNING"),
+    "notices": ("ERROR", "WARNING", "NOTICE"),
+    "infos": ("ERROR", "WARNING", "NOTICE", "INFO"),
+    "only_warnings": ("WARNING",),
+    "only_notices": ("NOTICE",),
+    "only_infos": ("INFO",),
+}
 
 class RiseClipseOutput:
     """
     A class used to parse and categorize messages from the Validator in order to use them 
     in Python scripts.
+
+    Messages are indexed by severity in a single pass on the first query by severity, and by category,
+    filename and line in another pass on the first other query, after which each getter only costs
+    the size of its result.
+
+    With ``lazy=True``, lines are kept as they are and only parsed when they are returned by a query,
+    see :py:class:`~riseclipse_lazy_messages.RiseClipseLazyMessages`: the severity of a message is read
+    from the beginning of its line, so ``get_errors()`` only parses errors. Queries on other fields
+    parse all messages.
+
+    Substring and keyword queries on ``category`` and ``data`` use another index, built on the first
+    such query: the distinct values of the field with, for each substring of :py:data:`NGRAM_SIZE`
+    characters and each word, the values containing it. Only the values containing all the substrings
+    of the query are then checked.
     """
 
-    def __init__(self, list_of_messages: list[str]):
+    def __init__(self, list_of_messages: list[str] | str, lazy: bool=False):
         """
         Constructs all the necessary attributes for the RiseClipseOutput object.
 
         Args:
-            list_of_messages: a list of messages to be parsed and categorized
+            list_of_messages: a list of messages to be parsed and categorized, or the whole
+                output of the validator as a single string
+            lazy: if True, messages are only parsed when they are used
+        """
+        if not lazy:
+            self.parsed_messages = RiseClipseParser(list_of_messages).parsed_messages
+        elif isinstance(list_of_messages, str):
+            self.parsed_messages = RiseClipseLazyMessages(list_of_messages.split('\n'))
+        else:
+            self.parsed_messages = RiseClipseLazyMessages(list_of_messages)
+        self._reset_index()
+
+    @classmethod
+    def from_messages(cls, messages: list[RiseClipseMessage]) -> "RiseClipseOutput":
         """
+        Builds a RiseClipseOutput object from messages already parsed.
+        
+        Args:
+            messages: the parsed messages
+        
+        Returns:
+            a RiseClipseOutput object holding the given messages
+        """
+        output = cls.__new__(cls)
+        output.parsed_messages = messages
+        output._reset_index()
+        return output
+
+    @classmethod
+    def from_file(cls, path: str, encoding: str=None) -> "RiseClipseOutput":
+        """
+        Builds a RiseClipseOutput object from a file saved by
+        :py:meth:`~riseclipse_validator.RiseClipseValidator.validate_to_txt`.
+        
+        The file is memory-mapped and messages are only parsed when they are used, see
+        :py:class:`~riseclipse_message_file.RiseClipseMessageFile`. Getters by severity
+        read the severity of messages without parsing them, only the returned messages are parsed.
+        
+        Args:
+            path: The path of the file
+            encoding: The encoding of the file, the preferred encoding of the system if None
+        
+        Returns:
+            a RiseClipseOutput object holding the messages of the file
+        """
+        return cls.from_messages(RiseClipseMessageFile(path, encoding))
+
+    @classmethod
+    def from_json_lines(cls, path: str, compress: bool=None) -> "RiseClipseOutput":
+        """
+        Builds a RiseClipseOutput object from a file written by :py:meth:`write_json_lines`.
+        
+        Args:
+            path: The path of the file
+            compress: Whether the file is compressed with gzip, if None when ``path`` ends with ``.gz``
+        
+        Returns:
+            a RiseClipseOutput object holding the messages of the file
+        """
+        return cls.from_messages(list(cls.iter_json_lines(path, compress)))
+
+    @staticmethod
+    def iter_json_lines(path: str, compress: bool=None) -> Iterator[RiseClipseMessage]:
+        """
+        Reads the messages of a file written by :py:meth:`write_json_lines` one at a time,
+        for example to give a saved output to :py:meth:`diff` without loading it.
+        
+        Args:
+            path: The path of the file
+            compress: Whether the file is compressed with gzip, if None when ``path`` ends with ``.gz``
+        
+        Returns:
+            an iterator over the messages of the file
+        """
+        if compress is None:
+            compress = path.endswith(".gz")
+        with (gzip.open if compress else open)(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    fields = json.loads(line)
+                    yield RiseClipseMessage(fields["message"], fields["category"], fields["line"],
+                                            fields["data"], fields["filename"], fields["severity"])
+
+    def set_messages(self, messages: list[RiseClipseMessage]) -> None:
+        """
+        Replaces all the messages of this object, lists previously returned by getters are not changed.
+        
+        Args:
+            messages: the new parsed messages
+        """
+        self.parsed_messages = messages
+        self._reset_index()
+
+    def _reset_index(self) -> None:
+        """
+        Forget the index, it will be built again on the next query.
+        """
+        self.severity_indexed = False
+        self.indexed = False
+        # names of the lists of messages by severity already built
+        self.built_lists = set()
         self.errors = []
         self.warnings = []
         self.notices = []
@@ -42,137 +185,134 @@ class RiseClipseOutput:
         self.only_warnings = []
         self.only_notices = []
         self.only_infos = []
-        self.parsed_messages = RiseClipseParser(list_of_messages).parsed_messages
+        # positions of messages in parsed_messages for each value of a field
+        self.positions_by_severity = {}
+        self.positions_by_category = {}
+        self.positions_by_filename = {}
+        self.positions_by_line = {}
+        # distinct values, their positions, n-gram and word index of category and data
+        self.text_indexes = {}
+
+    def _build_severity_index(self) -> None:
+        """
+        Builds the positions of messages by severity in one pass over the parsed messages.
+        """
+        if self.severity_indexed:
+            return
+        messages = self.parsed_messages
+        # lazy messages give their severity without being parsed
+        if hasattr(messages, "iter_severities"):
+            severities = messages.iter_severities()
+        else:
+            severities = (message.severity for message in messages)
+        positions_by_severity = self.positions_by_severity
+        for position, severity in enumerate(severities):
+            positions = positions_by_severity.get(severity)
+            if positions is None:
+                positions = positions_by_severity[severity] = []
+            positions.append(position)
+        self.severity_indexed = True
+
+    def _get_severity_list(self, name: str) -> list[RiseClipseMessage]:
+        """
+        Returns the list of messages with the given attribute name, filled on the first call.
+        """
+        messages = getattr(self, name)
+        if name not in self.built_lists:
+            self._build_severity_index()
+            runs = [self.positions_by_severity.get(severity, []) for severity in _SEVERITIES_OF_LIST[name]]
+            positions = [position for run in runs for position in run]
+            if len(runs) > 1:
+                positions.sort()
+            messages.extend(self._get_messages(positions))
+            self.built_lists.add(name)
+        return messages
+
+    def _build_index(self) -> None:
+        """
+        Builds the index by severity, and the positions of messages by category, filename and line
+        in one pass over the parsed messages.
+        """
+        if self.indexed:
+            return
+        self._build_severity_index()
+        for position, message in enumerate(self.parsed_messages):
+            self.positions_by_category.setdefault(message.category, []).append(position)
+            self.positions_by_filename.setdefault(message.filename, []).append(position)
+            self.positions_by_line.setdefault(message.line, []).append(position)
+        self.indexed = True
 
-    def get_errors(self) -> list[dict]:
+    def get_errors(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed error messages (dictionaries). To see the exact format, 
         see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of errors is not empty, it returns the list. Otherwise, it parses the 
-        messages and appends any error messages to the list.
-
         Returns:
             a list of parsed error messages
         """
-        if len(self.errors) > 0:
-            return self.errors
-        for message in self.parsed_messages:
-            if message["severity"] == "ERROR":
-                self.errors.append(message)
-        return self.errors
+        return self._get_severity_list("errors")
 
-    def get_warnings(self) -> list[dict]:
+    def get_warnings(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed warning and error messages (dictionaries). To see the exact 
         format, see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of warnings and errors is not empty, it returns the list. Otherwise, 
-        it parses the messages and appends any warning or error messages to the list.
-
         Returns:
             a list of parsed warning and error messages
         """
-        if len(self.warnings) > 0:
-            return self.warnings
-        for message in self.parsed_messages:
-            if message["severity"] in ["WARNING","ERROR"]:
-                self.warnings.append(message)
-        return self.warnings
+        return self._get_severity_list("warnings")
     
-    def get_notices(self) -> list[dict]:
+    def get_notices(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed notice, warning and error messages (dictionaries). 
         To see the exact format, see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of notices, warnings and errors is not empty, it returns the list. 
-        Otherwise, it parses the messages and appends any notice, warning and error messages 
-        to the list.
-
         Returns:
             a list of parsed notice, warning and error messages
         """
-        if len(self.notices) > 0:
-            return self.notices
-        for message in self.parsed_messages:
-            if message["severity"] in ["WARNING","ERROR","NOTICE"]:
-                self.notices.append(message)
-        return self.notices
+        return self._get_severity_list("notices")
 
-    def get_infos(self) -> list[dict]:
+    def get_infos(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed info, notices, warnings and errors messages (dictionaries). 
         To see the exact format, see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of infos, notices, warnings and errors is not empty, it returns the 
-        list. Otherwise, it parses the messages and appends any info, notice, warning and 
-        error messages to the list.
-
         Returns:
             a list of parsed info, notice, warning and error messages
         """
-        if len(self.infos) > 0:
-            return self.infos
-        for message in self.parsed_messages:
-            if message["severity"] in ["WARNING","ERROR","INFO","NOTICE"]:
-                self.infos.append(message)
-        return self.infos
+        return self._get_severity_list("infos")
 
-    def get_only_warnings(self) -> list[dict]:
+    def get_only_warnings(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed warning messages (dictionaries). To see the exact format, 
         see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of warnings is not empty, it returns the list. Otherwise, it parses 
-        the messages and appends any warning messages to the list.
-
         Returns:
             a list of parsed warning messages
         """
-        if len(self.only_warnings) > 0:
-            return self.only_warnings
-        for message in self.parsed_messages:
-            if message["severity"] == "WARNING":
-                self.only_warnings.append(message)
-        return self.only_warnings
+        return self._get_severity_list("only_warnings")
     
-    def get_only_notices(self) -> list[dict]:
+    def get_only_notices(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed notice messages (dictionaries). To see the exact format, 
         see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of notices is not empty, it returns the list. Otherwise, it parses the 
-        messages and appends any notice messages to the list.
-
         Returns:
             a list of parsed notice messages
         """
-        if len(self.notices) > 0:
-            return self.only_notices
-        for message in self.parsed_messages:
-            if message["severity"] == "NOTICE":
-                self.only_notices.append(message)
-        return self.only_notices
+        return self._get_severity_list("only_notices")
 
-    def get_only_infos(self) -> list[dict]:
+    def get_only_infos(self) -> list[RiseClipseMessage]:
         """
         Returns a list of parsed info messages (dictionaries). To see the exact format, 
         see :py:class:`~riseclipse_parser.RiseClipseParser`.
 
-        If the list of infos is not empty, it returns the list. Otherwise, it parses the 
-        messages and appends any info messages to the list.
-
         Returns:
             a list of parsed info messages
         """
-        if len(self.only_infos) > 0:
-            return self.only_infos
-        for message in self.parsed_messages:
-            if message["severity"] == "INFO":
-                self.only_infos.append(message)
-        return self.only_infos
+        return self._get_severity_list("only_infos")
     
-    def get_all_messages(self) -> list[dict]:
+    def get_all_messages(self) -> list[RiseClipseMessage]:
         """
         Returns a list of all parsed messages (dictionaries). To see the exact format, 
         see :py:class:`~riseclipse_parser.RiseClipseParser`.
@@ -181,8 +321,69 @@ class RiseClipseOutput:
             a list of all parsed messages
         """
         return self.parsed_messages
-    
-    def get_messages_by_category(self, category: str) -> list[dict]:
+
+    def summarize(self) -> RiseClipseSummary:
+        """
+        Returns the number of messages by severity, category and filename, computed in one pass
+        without building the lists returned by the getters.
+        See :py:class:`~riseclipse_summary.RiseClipseSummary`.
+
+        Returns:
+            the summary of the messages
+        """
+        return RiseClipseSummary(self.parsed_messages)
+
+    def diff(self, baseline: "RiseClipseOutput | Iterable[Mapping]") -> tuple[list[RiseClipseMessage], list[Mapping], list[RiseClipseMessage]]:
+        """
+        Compares the messages of this object with those of a previous run.
+        
+        Two messages are the same if they have the same severity, category, filename and data:
+        line numbers are ignored, so that messages moved by an edit of the file are not reported.
+        Messages are compared as multisets, if a message appears 3 times here and once in the
+        baseline, 2 occurrences are added. Both sets of messages are read once, and the baseline
+        is never kept in memory, only its removed messages.
+        
+        Example:
+            Find the errors introduced since the last night::
+            
+                added, removed, unchanged = output.diff(RiseClipseOutput.iter_json_lines("baseline.jsonl.gz"))
+                new_errors = [m for m in added if m.severity == "ERROR"]
+        
+        Args:
+            baseline: The messages of the previous run, a RiseClipseOutput object or any iterable of messages
+                or dictionaries with the same keys, such as :py:meth:`iter_json_lines`
+        
+        Returns:
+            the messages of this object that are not in the baseline, the messages of the baseline that
+            are not in this object, and the messages of this object that are also in the baseline,
+            each in their original order
+        """
+        if isinstance(baseline, RiseClipseOutput):
+            baseline = baseline.parsed_messages
+        messages = self.parsed_messages
+        # positions of the messages with each key, in decreasing order so that the first one is popped
+        positions_by_key = {}
+        for position in range(len(messages) - 1, -1, -1):
+            message = messages[position]
+            positions_by_key.setdefault((message.severity, message.category, message.filename, message.data), []).append(position)
+
+        matched = bytearray(len(messages))
+        removed = []
+        for message in baseline:
+            if isinstance(message, RiseClipseMessage):
+                key = (message.severity, message.category, message.filename, message.data)
+            else:
+                key = (message["severity"], message["category"], message["filename"], message["data"])
+            positions = positions_by_key.get(key)
+            if positions:
+                matched[positions.pop()] = 1
+            else:
+                removed.append(message)
+        added = [message for message, found in zip(messages, matched) if not found]
+        unchanged = [message for message, found in zip(messages, matched) if found]
+        return added, removed, unchanged
+
+    def get_messages_by_category(self, category: str) -> list[RiseClipseMessage]:
         """
         Returns a list of messages, filtered by category.
         The category does not have to be an exact match, it can be a substring of the category.
@@ -193,13 +394,9 @@ class RiseClipseOutput:
         Returns:
             a list of parsed messages filtered by category
         """
-        messages = []
-        for message in self.parsed_messages:
-            if category in message["category"]:
-                messages.append(message)
-        return messages
+        return self._get_messages(self._get_substring_positions("category", category))
     
-    def get_messages_by_specific_message(self, data: str) -> list[dict]:
+    def get_messages_by_specific_message(self, data: str) -> list[RiseClipseMessage]:
         """
         Returns a list of messages, filtered by a specific part of message, named data.
         The data does not have to be an exact match, it can be a substring of the message.
@@ -208,14 +405,31 @@ class RiseClipseOutput:
             data: the "data" e.g. specific message to filter the messages by
         
         Returns:
+            a list of parsed messages filtered by data
         """
-        messages = []
-        for message in self.parsed_messages:
-            if data in message["data"]:
-                messages.append(message)
-        return messages
+        return self._get_messages(self._get_substring_positions("data", data))
+
+    def get_messages_by_keyword(self, keyword: str) -> list[RiseClipseMessage]:
+        """
+        Returns a list of messages whose category or data contains the given word.
+        A word is a maximal sequence of letters, digits and underscores, so ``"DO"`` finds
+        ``"DO lnClass"`` but not ``"DOType"``.
+        
+        Args:
+            keyword: the word to look for
+        
+        Returns:
+            a list of parsed messages containing the word
+        """
+        matching = set()
+        for field in ("category", "data"):
+            values, positions, _, ids_by_token = self._get_text_index(field)
+            # a message may contain the word both in its category and its data
+            for id in ids_by_token.get(keyword, ()):
+                matching.update(positions[id])
+        return self._get_messages(sorted(matching))
     
-    def get_messages_by_filename(self, filename: str) -> list[dict]:
+    def get_messages_by_filename(self, filename: str) -> list[RiseClipseMessage]:
         """
         Returns a list of messages, filtered by the file containing the error/warning/notice/info.
         
@@ -225,58 +439,176 @@ class RiseClipseOutput:
         Returns:
             a list of parsed messages filtered by filename
         """
-        messages = []
-        for message in self.parsed_messages:
-            if message["filename"] == filename:
-                messages.append(message)
-        return messages
+        self._build_index()
+        return self._get_messages(self.positions_by_filename.get(filename, []))
     
-    def get_messages_by_line(self, line) -> list[dict]:
+    def get_messages_by_line(self, line) -> list[RiseClipseMessage]:
         """
         Returns a list of messages, filtered by the line number in the file containing 
         the error/warning/notice/info.
         
         Args:
-            line: the line number to filter the messages by
+            line: the line number to filter the messages by, as a string or an integer
         
         Returns:
             a list of parsed messages filtered by line number
         """
-        messages = []
-        for message in self.parsed_messages:
-            if message["line"] == line:
-                messages.append(message)
-        return messages
+        self._build_index()
+        return self._get_messages(self.positions_by_line.get(self._line_key(line), []))
+    
+    def get_positions_by(self, field: str) -> dict[str | int, list[int]]:
+        """
+        Returns the index of messages by the value of a field: for each value, the positions
+        of the messages having it in the list returned by :py:meth:`get_all_messages`, in increasing order.
+        The index is built on the first call; messages of a lazy output are not parsed for ``"severity"``.
+        
+        Example:
+            Count messages by severity::
+            
+                counts = {severity: len(positions) for severity, positions in out.get_positions_by("severity").items()}
+        
+        Args:
+            field: ``"severity"``, ``"category"``, ``"filename"`` or ``"line"``
+        
+        Raises:
+            ValueError: If the field is not one of them.
+        
+        Returns:
+            a dictionary giving the list of positions of each value, it must not be modified
+        """
+        if field == "severity":
+            self._build_severity_index()
+            return self.positions_by_severity
+        if field not in ("category", "filename", "line"):
+            raise ValueError("Unknown field: " + str(field))
+        self._build_index()
+        return getattr(self, "positions_by_" + field)
     
-    def get_messages_with_filter(self, filtering_dict: dict) -> list[dict]:
+    def get_messages_with_filter(self, filtering_dict: dict) -> list[RiseClipseMessage]:
         """
         Returns a list of messages, filtered with a dictionnary containing informations on 
         which we want to filter messages in the file containing the error/warning/notice/info.
         
+        Only the messages of the smallest index entry among the filtered fields are checked.
+        
         Args:
-            filtering_dict: the filter itself, fields of the dictionary are the the same as a parsed message
+            filtering_dict: the filter itself, fields of the dictionary are the the same as a parsed message,
+                the line number may be given as a string or an integer
         
         Returns:
             a list of parsed messages filtered according to the filter
         """
+        self._build_index()
+        candidates = None
+        for field, positions_by_value in (("severity", self.positions_by_severity),
+                                          ("filename", self.positions_by_filename),
+                                          ("line", self.positions_by_line)):
+            if field in filtering_dict:
+                value = filtering_dict[field]
+                if field == "line":
+                    value = self._line_key(value)
+                positions = positions_by_value.get(value, [])
+                if candidates is None or len(positions) < len(candidates):
+                    candidates = positions
+        for field in ("category", "data"):
+            if field in filtering_dict:
+                positions = self._get_substring_positions(field, filtering_dict[field])
+                if candidates is None or len(positions) < len(candidates):
+                    candidates = positions
+        if candidates is None:
+            candidates = range(len(self.parsed_messages))
+
         messages = []
-        for message in self.parsed_messages:
+        for position in candidates:
+            message = self.parsed_messages[position]
             b = True
             for filt in filtering_dict:
                 if filt == "category" or filt == "data":
                     b = b and (filtering_dict[filt] in message[filt])
+                elif filt == "line":
+                    b = b and (self._line_key(filtering_dict[filt]) == message.line)
                 else:
                     b = b and (filtering_dict[filt] == message[filt])
-
-
-            
             if b :
                 messages.append(message)
         return messages
+
+    def _get_substring_positions(self, field: str, substring: str) -> list[int]:
+        """
+        Returns the positions of messages whose category or data contains the given string, in increasing order.
+        """
+        values, positions, ids_by_ngram, _ = self._get_text_index(field)
+        if len(substring) < NGRAM_SIZE:
+            ids = range(len(values))
+        else:
+            postings = []
+            for start in range(len(substring) - NGRAM_SIZE + 1):
+                ids = ids_by_ngram.get(substring[start:start + NGRAM_SIZE])
+                if ids is None:
+                    return []
+                postings.append(ids)
+            postings.sort(key=len)
+            ids = set(postings[0])
+            for other in postings[1:]:
+                if len(ids) == 0:
+                    break
+                ids.intersection_update(other)
+        # the n-grams may be found at other places than in the substring
+        matching = [positions[id] for id in ids if substring in values[id]]
+        if len(matching) == 1:
+            return matching[0]
+        # sorting finds the increasing runs, faster than merging many lists
+        result = [position for run in matching for position in run]
+        result.sort()
+        return result
+
+    def _get_text_index(self, field: str) -> tuple[list[str], list[list[int]], dict[str, list[int]], dict[str, list[int]]]:
+        """
+        Returns the distinct values of category or data, the positions of messages having each value,
+        and the values (as indices in the list) containing each n-gram and each word.
+        """
+        index = self.text_indexes.get(field)
+        if index is None:
+            if field == "category":
+                self._build_index()
+                positions_by_value = self.positions_by_category
+            else:
+                positions_by_value = {}
+                for position, message in enumerate(self.parsed_messages):
+                    positions_by_value.setdefault(message.data, []).append(position)
+            values = list(positions_by_value)
+            ids_by_ngram = {}
+            ids_by_token = {}
+            for id, value in enumerate(values):
+                for ngram in {value[start:start + NGRAM_SIZE] for start in range(len(value) - NGRAM_SIZE + 1)}:
+                    ids_by_ngram.setdefault(ngram, []).append(id)
+                for token in set(_TOKEN_PATTERN.findall(value)):
+                    ids_by_token.setdefault(token, []).append(id)
+            index = (values, [positions_by_value[value] for value in values], ids_by_ngram, ids_by_token)
+            self.text_indexes[field] = index
+        return index
+
+    def _line_key(self, line: str | int) -> int | str:
+        """
+        Returns the key of the given line number in the index, the same as :py:attr:`RiseClipseMessage.line`.
+        """
+        if isinstance(line, str) and line.isascii() and line.isdigit() and str(int(line)) == line:
+            return int(line)
+        return line
+
+    def _get_messages(self, positions: list[int]) -> list[RiseClipseMessage]:
+        """
+        Returns the parsed messages at the given positions.
+        """
+        return [self.parsed_messages[position] for position in positions]
     
     def to_csv(self, path: str, separator: str =",") -> str:
         """
         Writes the parsed messages to a CSV file and returns the CSV as a string.
+        Fields containing the separator, quotes or newlines are quoted.
+        
+        Note:
+            Use :py:meth:`write_csv` to avoid building the whole CSV in memory.
         
         Args:
             path: The path to write the CSV file to
@@ -289,20 +621,46 @@ class RiseClipseOutput:
             print("No messages to write to CSV.")
             return ""
         
-        csv = ""
-        message = self.parsed_messages[0]
-        for key in message:
-            if key != "message":
-                csv += key + separator
-        csv += "message\n"
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=separator, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
         for message in self.parsed_messages:
-            for key in message:
-                if key != "message":
-                    csv += message[key] + separator
-            csv += message["message"] + "\n"
-        with open(path, "w") as f:
-            f.write(csv)
-        return csv
+            writer.writerow([message[column] for column in CSV_COLUMNS])
+        csv_text = buffer.getvalue()
+        with open(path, "w", newline="") as f:
+            f.write(csv_text)
+        return csv_text
+    
+    def write_csv(self, path: str, separator: str=",", compress: bool=None) -> int:
+        """
+        Writes the parsed messages to a CSV file, one message at a time.
+        See :py:class:`~riseclipse_writer.RiseClipseWriter`.
+        
+        Args:
+            path: The path to write the CSV file to
+            separator: The separator to use in the csv file
+            compress: Whether the file is compressed with gzip, if None when ``path`` ends with ``.gz``
+        
+        Returns:
+            the number of messages written
+        """
+        with RiseClipseWriter(path, "csv", separator, compress) as writer:
+            return writer.write_all(self.parsed_messages)
+    
+    def write_json_lines(self, path: str, compress: bool=None) -> int:
+        """
+        Writes the parsed messages to a JSON Lines file (one JSON object per line), one message at a time.
+        See :py:class:`~riseclipse_writer.RiseClipseWriter`.
+        
+        Args:
+            path: The path to write the file to
+            compress: Whether the file is compressed with gzip, if None when ``path`` ends with ``.gz``
+        
+        Returns:
+            the number of messages written
+        """
+        with RiseClipseWriter(path, "jsonl", compress=compress) as writer:
+            return writer.write_all(self.parsed_messages)
     
     def to_json(self,path: str)-> dict:
         """
@@ -316,27 +674,40 @@ class RiseClipseOutput:
         """
         json_dump = {}
         for i in range(len(self.parsed_messages)):
-            json_dump[i] = self.parsed_messages[i]
+            json_dump[i] = self.parsed_messages[i].to_dict()
         with open(path, "w") as f:
             json.dump(json_dump, f)
         return json_dump
     
-    def to_dataframe(self) -> pd.DataFrame:
+    def to_dataframe(self, arrow_strings: bool=False) -> "pd.DataFrame":
         """
         Returns a pandas DataFrame of the parsed messages.
         
+        Columns are built directly with suitable types:
+        
+        * ``severity`` is an ordered categorical, from ``DEBUG`` to ``ERROR``, so that
+          ``df[df.severity >= "WARNING"]`` selects warnings and errors
+        * ``category`` and ``filename`` are categoricals
+        * ``line`` is a nullable integer, ``<NA>`` if the line is not a number
+        * ``message`` and ``data`` are strings
+        
+        Args:
+            arrow_strings: If True, ``message`` and ``data`` are Arrow-backed string columns (``pyarrow`` is needed).
+        
         Returns:
             a pandas DataFrame of the parsed messages
         """
         import pandas as pd
-        dict_columns = {'message':[],'category':[],'line':[],'data':[],'filename':[],'severity':[]}
-        for message in self.parsed_messages:
-            dict_columns['message'].append(message['message'])
-            dict_columns['category'].append(message['category'])
-            dict_columns['line'].append(message['line'])
-            dict_columns['data'].append(message['data'])
-            dict_columns['filename'].append(message['filename'])
-            dict_columns['severity'].append(message['severity'])
-        return pd.DataFrame.from_dict(dict_columns)
-    
-    
\ No newline at end of file
+        messages = self.parsed_messages
+        severities = [message.severity for message in messages]
+        # unknown severities are put below DEBUG
+        levels = sorted(set(severities).difference(SEVERITY_LEVELS)) + list(SEVERITY_LEVELS)
+        string_dtype = "string[pyarrow]" if arrow_strings else "string"
+        return pd.DataFrame({
+            'message': pd.array([message.message for message in messages], dtype=string_dtype),
+            'category': pd.Categorical([message.category for message in messages]),
+            'line': pd.array([message.line if isinstance(message.line, int) else None for message in messages], dtype="Int64"),
+            'data': pd.array([message.data for message in messages], dtype=string_dtype),
+            'filename': pd.Categorical([message.filename for message in messages]),
+            'severity': pd.Categorical(severities, categories=levels, ordered=True),
+        })
@@ -17,7 +17,27 @@
 # **      https://riseclipse.github.io
 # *************************************************************************
 
-import copy
+import re
+from typing import Iterable, Iterator
+
+from riseclipse_message import RiseClipseMessage
+
+
+# A message looks like "SEVERITY: [category] data (filename:line)".
+# The location spans from the first "(" to the last ")", the category from the first "["
+# to the last "]" of what remains; the pattern accepts the usual case where the category
+# is before the location, other messages are handled by RiseClipseParser._parse_irregular().
+_MESSAGE_PATTERN = re.compile(
+    r'(?P<head>[^(\[]*)\[(?P<category>[^(]*)\](?P<middle>[^(\]]*)'
+    r'\((?P<location>.*)\)(?P<tail>[^)\]]*)',
+    re.DOTALL)
+
+# Same pattern, restricted to one line of a buffer
+_BUFFER_PATTERN = re.compile(
+    r'^(?P<head>[^(\[\n]*)\[(?P<category>[^(\n]*)\](?P<middle>[^(\]\n]*)'
+    r'\((?P<location>[^\n]*)\)(?P<tail>[^)\]\n]*)$',
+    re.MULTILINE)
+
 
 class RiseClipseParser:
     """
@@ -25,21 +45,24 @@ class RiseClipseParser:
     This class is used to convert raw messages into a structured format that can be easily 
     processed or displayed.
     """
-    def __init__(self, list_of_messages: list[str]):
+    def __init__(self, list_of_messages: list[str] | str=None):
         """
         Constructs all the necessary attributes for the RiseClipseParser object.
         
         Args:
-            list_of_messages: The list of messages to be parsed
+            list_of_messages: The list of messages to be parsed, or the whole output of the validator
+                as a single string, None if messages will only be given to :py:meth:`iter_parse`
         """
         self.list_of_messages = list_of_messages
         self.parsed_messages = []
-        if self.list_of_messages != None and len(self.list_of_messages) > 0:
+        if self.list_of_messages == None:
+            return
+        if len(self.list_of_messages) > 0:
             self.parse_messages()
         else:
             print("No messages to parse.")
     
-    def get_parsed_messages(self) -> list[str]:
+    def get_parsed_messages(self) -> list[RiseClipseMessage]:
         """
         Returns the list of parsed messages.
         """
@@ -50,21 +73,65 @@ class RiseClipseParser:
         Iterates over each message in the list and parses it using the parse_message method.
         Appends the parsed message to the parsed_messages attribute.
         """
-        for message in self.list_of_messages:
+        if isinstance(self.list_of_messages, str):
+            self.parsed_messages.extend(self.iter_parse_buffer(self.list_of_messages))
+        else:
+            self.parsed_messages.extend(self.iter_parse(self.list_of_messages))
+    
+    def iter_parse(self, messages: Iterable[str]) -> Iterator[RiseClipseMessage]:
+        """
+        Parses messages one at a time while they are read from the given iterable,
+        without storing them. Empty messages are skipped.
+        
+        Args:
+            messages: The messages to be parsed, for example the lines given by
+                :py:meth:`~java_runner.JavaRunner.run_iter`
+        
+        Returns:
+            An iterator over the parsed messages, see :py:meth:`parse_message` for their format.
+        """
+        for message in messages:
             if len(message) > 0:
-                self.parsed_messages.append(self.parse_message(message))
+                yield self.parse_message(message)
+    
+    def iter_parse_buffer(self, buffer: str) -> Iterator[RiseClipseMessage]:
+        """
+        Parses all the lines of the given text, as displayed by the validator on stdout.
+        Well-formed lines are found with a single scan of the text; the result is the same as
+        parsing each line given by ``buffer.split('\\n')``. Empty lines are skipped.
+        
+        Args:
+            buffer: The text to be parsed.
+        
+        Returns:
+            An iterator over the parsed messages, see :py:meth:`parse_message` for their format.
+        """
+        position = 0
+        build_message = self._build_message
+        for match in _BUFFER_PATTERN.finditer(buffer):
+            start, end = match.span()
+            # only a newline between two consecutive well-formed lines
+            if start > position + 1:
+                yield from self.iter_parse(buffer[position:start].split('\n'))
+            yield build_message(match)
+            position = end
+        yield from self.iter_parse(buffer[position:].split('\n'))
     
-    def parse_message(self, message: str) -> dict:
+    def parse_message(self, message: str) -> RiseClipseMessage:
         """
-        Parses a single message into a dictionary with keys for ``message``, ``category``, ``line``, ``data``, ``filename``, and ``severity``.
-        Each key's value is extracted from the message by splitting the message string on commas and selecting the appropriate element.
+        Parses a single message into a :py:class:`~riseclipse_message.RiseClipseMessage`, which can also be used as
+        a dictionary with keys for ``message``, ``category``, ``line``, ``data``, ``filename``, and ``severity``.
+        The message is expected to follow the format ``SEVERITY: [category] data (filename:line)``.
         
         Args:
             message: A single message to be parsed i.e. a line from the standard output of the validator
         
+        Raises:
+            ValueError: If the message has no category or no location.
+        
         Returns:
-            A dictionary containing the parsed message.
-            Keys of the dictionary are ``message``, ``category``, ``line``, ``data``, ``filename``, and ``severity``:
+            The parsed message.
+            Keys of the message are ``message``, ``category``, ``line``, ``data``, ``filename``, and ``severity``:
             
             * the field ``message`` contains the original non-parsed message
             * the field ``category`` contains the category of the message
@@ -74,29 +141,45 @@ class RiseClipseParser:
             * the field ``severity`` contains the severity of the message (ERROR, WARNING, NOTICE, INFO, DEBUG)
         
         """
-        import re
-        #print("Parsing message: " + message)
-        parsed_message = {}
-        parsed_message["message"] = message
-
-        regex_end = r'\((\w|\W)*\)'
-        regex_middle = r'\[(\w|\W)*\]'
-        match = re.search(regex_end, message)
-        filename = match[0].strip()[1:-1].split(":")[0]
-        line = match[0].strip()[1:-1].split(":")[1]
-        message = re.sub(regex_end, '', message)
-        match = re.search(regex_middle, message)
-        category = match[0].strip()[1:-1]
-        message = re.sub(regex_middle, '', message)
-        severity = message[:8].strip()
-        message = copy.copy(message[9:].strip())
-        data = message.strip()
-
-        parsed_message["category"] = category
-        parsed_message["line"] = line
-        parsed_message["data"] = data
-        parsed_message["filename"] = filename
-        parsed_message["severity"] = severity
-        return parsed_message
-
+        match = _MESSAGE_PATTERN.fullmatch(message)
+        if match is None:
+            return self._parse_irregular(message)
+        return self._build_message(match)
     
+    def _build_message(self, match: re.Match) -> RiseClipseMessage:
+        """
+        Builds the parsed message from a match of the message pattern.
+        """
+        head, category, middle, location, tail = match.groups()
+        remaining = head + middle + tail
+        filename, colon, line = location.rpartition(':')
+        if not colon:
+            raise ValueError("No line number in message: " + match[0])
+        return RiseClipseMessage(match[0], category, line, remaining[9:].strip(), filename, remaining[:8].strip())
+    
+    def _parse_irregular(self, message: str) -> RiseClipseMessage:
+        """
+        Parses a message where the category is not before the location: the location is
+        removed first, then the category is looked for in what remains.
+        """
+        start = message.find('(')
+        end = message.rfind(')')
+        if start < 0 or end < start:
+            raise ValueError("No location in message: " + message)
+        location = message[start + 1:end]
+        remaining = message[:start] + message[end + 1:]
+        start = remaining.find('[')
+        end = remaining.rfind(']')
+        if start < 0 or end < start:
+            raise ValueError("No category in message: " + message)
+        return self._make_message(message, remaining[start + 1:end], location, remaining[:start] + remaining[end + 1:])
+    
+    def _make_message(self, message: str, category: str, location: str, remaining: str) -> RiseClipseMessage:
+        """
+        Builds the parsed message from its parts; ``remaining`` is the message without category and location.
+        """
+        # the line number is after the last colon, the filename may contain colons
+        filename, colon, line = location.rpartition(':')
+        if not colon:
+            raise ValueError("No line number in message: " + message)
+        return RiseClipseMessage(message, category, line, remaining[9:].strip(), filename, remaining[:8].strip())
@@ -0,0 +1,185 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import re
+from collections import Counter
+from fnmatch import fnmatchcase
+from typing import Iterable
+
+from riseclipse_message import FIELDS, RiseClipseMessage, SEVERITY_LEVELS
+from riseclipse_output import RiseClipseOutput
+
+
+class RiseClipseQuery:
+    """
+    A query on the messages of a :py:class:`~riseclipse_output.RiseClipseOutput`, compiled once
+    and executed as many times as needed.
+
+    All the given conditions must hold. The conditions on severity, filename, line and category
+    are turned, on each output, into the set of accepted values of the field using the index of
+    the output; the messages of the condition accepting the fewest messages are the only ones checked.
+    The regular expression on data is checked last.
+
+    Example:
+        Count errors and warnings per file and category::
+
+            query = RiseClipseQuery(min_severity="WARNING", filename="*.icd", category_prefix="NSD")
+            counts = query.count(output, group_by=("filename", "category"))
+            for (filename, category), count in counts.items():
+                print(filename, category, count)
+
+    Attributes:
+        min_severity (str): The lowest accepted severity, see :py:data:`~riseclipse_message.SEVERITY_LEVELS`.
+        filename (str): The glob pattern (``*``, ``?``, ``[...]``) the filename must match.
+        lines (tuple[int, int]): The first and last accepted line numbers, both included, None for no bound.
+        category_prefix (str): The prefix of accepted categories.
+        data_pattern (re.Pattern): The regular expression searched in data.
+    """
+
+    def __init__(self, min_severity: str=None, filename: str=None, lines: tuple[int, int]=None,
+                 category_prefix: str=None, data_pattern: str=None):
+        """
+        Compiles the query, conditions that are None are not checked.
+
+        Args:
+            min_severity: The lowest accepted severity, messages with a severity at this level or above are accepted.
+            filename: The glob pattern the filename must match, case sensitive.
+            lines: The first and last accepted line numbers, both included; one of them may be None.
+                Messages without a numeric line are not accepted.
+            category_prefix: The prefix of accepted categories.
+            data_pattern: The regular expression searched (with ``re.search``) in data.
+        """
+        if min_severity is not None and min_severity not in SEVERITY_LEVELS:
+            raise ValueError("Unknown severity: " + min_severity)
+        self.min_severity = min_severity
+        self.filename = filename
+        self.lines = lines
+        self.category_prefix = category_prefix
+        self.data_pattern = None if data_pattern is None else re.compile(data_pattern)
+        self.severities = None
+        if min_severity is not None:
+            self.severities = frozenset(SEVERITY_LEVELS[SEVERITY_LEVELS.index(min_severity):])
+
+    def execute(self, output: RiseClipseOutput) -> list[RiseClipseMessage]:
+        """
+        Returns the messages of the output satisfying the query, in their original order.
+
+        Args:
+            output: The output queried.
+
+        Returns:
+            The list of matching messages.
+        """
+        return list(self._iter_matches(output))
+
+    def count(self, output: RiseClipseOutput, group_by: str | tuple[str, ...]=None) -> int | dict:
+        """
+        Counts the messages of the output satisfying the query, without building the list of them.
+
+        Args:
+            output: The output queried.
+            group_by: None to count all messages, a field name (``"severity"``, ``"category"``,
+                ``"filename"``, ``"line"``...) or a tuple of field names to count per value.
+
+        Returns:
+            The number of matching messages, or a dictionary giving the number for each value
+            of the field (or tuple of values of the fields), from the most to the least frequent.
+        """
+        if group_by is None:
+            return sum(1 for _ in self._iter_matches(output))
+        fields = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+        for field in fields:
+            if field not in FIELDS:
+                raise ValueError("Unknown field: " + field)
+        if isinstance(group_by, str):
+            counts = Counter(getattr(message, group_by) for message in self._iter_matches(output))
+        else:
+            counts = Counter(tuple(getattr(message, field) for field in fields) for message in self._iter_matches(output))
+        return dict(counts.most_common())
+
+    def matches(self, message: RiseClipseMessage) -> bool:
+        """
+        Checks a single message, for example one from :py:meth:`~riseclipse_validator.RiseClipseValidator.validate_iter`.
+
+        Args:
+            message: The message checked.
+
+        Returns:
+            True if the message satisfies the query.
+        """
+        if self.severities is not None and message.severity not in self.severities:
+            return False
+        if self.filename is not None and not fnmatchcase(message.filename, self.filename):
+            return False
+        if self.lines is not None and not self._accept_line(message.line):
+            return False
+        if self.category_prefix is not None and not message.category.startswith(self.category_prefix):
+            return False
+        if self.data_pattern is not None and self.data_pattern.search(message.data) is None:
+            return False
+        return True
+
+    def _iter_matches(self, output: RiseClipseOutput) -> Iterable[RiseClipseMessage]:
+        """
+        Yields the matching messages, checking only those of the most selective condition.
+        """
+        # lazy outputs are indexed by severity without parsing messages
+        accepts = []
+        if self.severities is not None:
+            accepts.append(("severity", output.get_positions_by("severity"), self.severities.__contains__))
+        if self.filename is not None:
+            accepts.append(("filename", output.get_positions_by("filename"), lambda value: fnmatchcase(value, self.filename)))
+        if self.lines is not None:
+            accepts.append(("line", output.get_positions_by("line"), self._accept_line))
+        if self.category_prefix is not None:
+            accepts.append(("category", output.get_positions_by("category"), lambda value: value.startswith(self.category_prefix)))
+        # for each field with a condition, the accepted values and the positions of messages having them
+        conditions = []
+        for field, positions_by_value, accept in accepts:
+            values = {value for value in positions_by_value if accept(value)}
+            size = sum(len(positions_by_value[value]) for value in values)
+            conditions.append((size, field, values, positions_by_value))
+
+        messages = output.get_all_messages()
+        if len(conditions) == 0:
+            candidates = messages
+        else:
+            conditions.sort(key=lambda condition: condition[0])
+            _, _, values, positions_by_value = conditions.pop(0)
+            if len(values) == 1:
+                positions = positions_by_value[next(iter(values))]
+            else:
+                positions = [position for value in values for position in positions_by_value[value]]
+                positions.sort()
+            candidates = (messages[position] for position in positions)
+
+        checks = [(field, values) for _, field, values, _ in conditions]
+        pattern = self.data_pattern
+        for message in candidates:
+            if all(getattr(message, field) in values for field, values in checks) \
+                    and (pattern is None or pattern.search(message.data) is not None):
+                yield message
+
+    def _accept_line(self, line: int | str) -> bool:
+        if self.lines is None:
+            return True
+        if not isinstance(line, int):
+            return False
+        first, last = self.lines
+        return (first is None or first <= line) and (last is None or line <= last)
@@ -0,0 +1,192 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+from collections import Counter
+from heapq import nlargest
+from typing import Iterable
+
+from riseclipse_message import RiseClipseMessage, SEVERITY_LEVELS
+
+
+class RiseClipseSummary:
+    """
+    Counts of messages by severity, category and filename, computed in one pass without
+    keeping the messages.
+
+    The memory used only depends on the number of different (severity, category, filename)
+    triples, so a summary can be computed on the messages of
+    :py:meth:`~riseclipse_validator.RiseClipseValidator.validate_iter` as they come.
+
+    Example:
+        Fail a CI job if there is any error, and show the worst files::
+
+            summary = RiseClipseSummary()
+            summary.add_all(validator.validate_iter())
+            if summary.count_at_least("ERROR") > 0:
+                for filename, count in summary.top_filenames(5, min_severity="ERROR"):
+                    print(filename, count)
+                exit(1)
+
+    Attributes:
+        histogram (collections.Counter): The number of messages for each (severity, category, filename) triple.
+    """
+
+    def __init__(self, messages: Iterable[RiseClipseMessage]=None):
+        """
+        Initialize the RiseClipseSummary object.
+
+        Args:
+            messages: The messages counted, they are consumed one at a time; None for an empty summary.
+        """
+        self.histogram = Counter()
+        if messages is not None:
+            self.add_all(messages)
+
+    def add(self, message: RiseClipseMessage) -> None:
+        """
+        Counts one message.
+
+        Args:
+            message: The message.
+        """
+        self.histogram[(message.severity, message.category, message.filename)] += 1
+
+    def add_all(self, messages: Iterable[RiseClipseMessage]) -> int:
+        """
+        Counts all the given messages, they are consumed one at a time.
+
+        Args:
+            messages: The messages.
+
+        Returns:
+            The number of messages counted.
+        """
+        total = self.get_total()
+        self.histogram.update((message.severity, message.category, message.filename) for message in messages)
+        return self.get_total() - total
+
+    def update(self, other: "RiseClipseSummary") -> None:
+        """
+        Adds the counts of another summary, for example one of another batch of files.
+
+        Args:
+            other: The other summary.
+        """
+        self.histogram.update(other.histogram)
+
+    def get_total(self) -> int:
+        """
+        Returns:
+            The number of messages counted.
+        """
+        return self.histogram.total()
+
+    def count(self, severity: str=None, category: str=None, filename: str=None) -> int:
+        """
+        Returns the number of messages with the given severity, category and filename.
+
+        Args:
+            severity: The severity, None for any.
+            category: The category, None for any.
+            filename: The filename, None for any.
+
+        Returns:
+            The number of messages.
+        """
+        return sum(count for (s, c, f), count in self.histogram.items()
+                   if (severity is None or s == severity)
+                   and (category is None or c == category)
+                   and (filename is None or f == filename))
+
+    def count_at_least(self, severity: str) -> int:
+        """
+        Returns the number of messages with the given severity or a higher one, so
+        ``count_at_least("WARNING")`` is the length of :py:meth:`~riseclipse_output.RiseClipseOutput.get_warnings`.
+
+        Args:
+            severity: The lowest severity counted, see :py:data:`~riseclipse_message.SEVERITY_LEVELS`.
+
+        Returns:
+            The number of messages.
+        """
+        severities = self._get_severities(severity)
+        return sum(count for (s, _, _), count in self.histogram.items() if s in severities)
+
+    def get_severity_counts(self) -> dict[str, int]:
+        """
+        Returns:
+            The number of messages of each severity, from the highest to the lowest one.
+            Severities that are not in :py:data:`~riseclipse_message.SEVERITY_LEVELS` come last.
+        """
+        counts = Counter()
+        for (severity, _, _), count in self.histogram.items():
+            counts[severity] += count
+        order = {severity: i for i, severity in enumerate(reversed(SEVERITY_LEVELS))}
+        return {severity: counts[severity] for severity in sorted(counts, key=lambda s: (order.get(s, len(order)), s))}
+
+    def top_categories(self, k: int=10, min_severity: str=None) -> list[tuple[str, int]]:
+        """
+        Returns the categories with the most messages.
+
+        Args:
+            k: The number of categories returned.
+            min_severity: Only messages with this severity or a higher one are counted, None for all messages.
+
+        Returns:
+            Pairs of category and number of messages, from the most to the least frequent.
+        """
+        return self._top(1, k, min_severity)
+
+    def top_filenames(self, k: int=10, min_severity: str=None) -> list[tuple[str, int]]:
+        """
+        Returns the files with the most messages.
+
+        Args:
+            k: The number of files returned.
+            min_severity: Only messages with this severity or a higher one are counted, None for all messages.
+
+        Returns:
+            Pairs of filename and number of messages, from the most to the least frequent.
+        """
+        return self._top(2, k, min_severity)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            The summary as a dictionary that can be saved as JSON: the total, the counts by severity
+            and the list of (severity, category, filename, count) entries.
+        """
+        return {
+            "total": self.get_total(),
+            "severities": self.get_severity_counts(),
+            "histogram": [[s, c, f, count] for (s, c, f), count in self.histogram.most_common()],
+        }
+
+    def _top(self, field: int, k: int, min_severity: str) -> list[tuple[str, int]]:
+        severities = None if min_severity is None else self._get_severities(min_severity)
+        counts = Counter()
+        for key, count in self.histogram.items():
+            if severities is None or key[0] in severities:
+                counts[key[field]] += count
+        return nlargest(k, counts.items(), key=lambda item: item[1])
+
+    def _get_severities(self, severity: str) -> tuple[str, ...]:
+        if severity not in SEVERITY_LEVELS:
+            raise ValueError("Unknown severity: " + severity)
+        return SEVERITY_LEVELS[SEVERITY_LEVELS.index(severity):]
@@ -17,20 +17,48 @@
 # **      https://riseclipse.github.io
 # *************************************************************************
 
-from java_runner import JavaRunner
+import os
+import re
+import time
+from os import cpu_count
+from typing import Callable, Iterator
+
+from async_java_runner import AsyncJavaRunner
+from riseclipse_message import RiseClipseMessage
+from riseclipse_metrics import RiseClipseMetrics
 from riseclipse_output import RiseClipseOutput
+from riseclipse_parser import RiseClipseParser
+
+
+_VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
+# versions of jar files already read, by (path, size, modification time)
+_jar_versions = {}
 
 
-class RiseClipseValidator(JavaRunner) :
+class RiseClipseValidator(AsyncJavaRunner) :
     """
     Base class for RiseClipse validators. It takes care of common options.
     
+    Each call to a ``validate*()`` method produces a :py:class:`~riseclipse_metrics.RiseClipseMetrics`
+    (startup of the JVM, wall and CPU time, peak memory, size of the output, parse time, number of
+    messages of each severity), which is given to the metrics hooks.
+    
+    Example:
+        Keep the measures of all validations for Prometheus::
+        
+            exporter = RiseClipseMetricsExporter("/var/lib/node_exporter/riseclipse.prom", format="prometheus")
+            validator.add_metrics_hook(exporter)
+    
     Attributes:
         options (list[str]): The set of options that will be added when the validation is launched.
         level (str): The level of displayed messages, initialized to ``"warning"``.
         format_string (str): The format string used by the ``java.util.Formatter``.
         use_color (bool): Whether colors are used when result is displayed on stdout, initialized to ``False``.
         files (list[str]): The files that will be given to the validator.
+        cache (None or RiseClipseCache): The cache of validation results used by :py:meth:`validate`.
+        metrics_hooks (list[Callable[[RiseClipseMetrics], None]]): The functions called with the measures of each validation.
+        last_metrics (None or RiseClipseMetrics): The measures of the last validation.
     """
 
     def __init__(self, jarPath: str):
@@ -51,6 +79,9 @@ class RiseClipseValidator(JavaRunner) :
         self.use_color = False
         # path to files must be at the end
         self.files = []
+        self.cache = None
+        self.metrics_hooks = []
+        self.last_metrics = None
 
     def get_output_level(self) -> str:
         """
@@ -140,6 +171,92 @@ class RiseClipseValidator(JavaRunner) :
         """
         self.files.append(file)
     
+    def set_cache(self, cache: "RiseClipseCache") -> None:
+        """
+        Set the cache of validation results used by :py:meth:`validate`.
+        
+        Args:
+            cache: The :py:class:`~riseclipse_cache.RiseClipseCache` to use, or None to always run the validator.
+        """
+        self.cache = cache
+    
+    def get_cache(self) -> "RiseClipseCache":
+        """
+        Returns the cache of validation results used by :py:meth:`validate`.
+        
+        Returns:
+            The cache or None.
+        """
+        return self.cache
+    
+    def invalidate_cache(self) -> bool:
+        """
+        Removes from the cache the result of validation with the current set of arguments and files,
+        the next call to :py:meth:`validate` will run the validator.
+        
+        Returns:
+            True if there was such a result in the cache, False otherwise.
+        """
+        if self.cache is None:
+            return False
+        arguments = self._compute_arguments(display_copyright=False, use_format=False)
+        return self.cache.invalidate(self.cache.compute_key(self, arguments))
+    
+    def add_metrics_hook(self, hook: Callable[[RiseClipseMetrics], None]) -> None:
+        """
+        Add a function called with the measures of each validation, when it ends.
+        
+        Exceptions raised by the function are not caught.
+        
+        Args:
+            hook: The function, such as a :py:class:`~riseclipse_metrics_exporter.RiseClipseMetricsExporter`.
+        """
+        self.metrics_hooks.append(hook)
+    
+    def remove_metrics_hook(self, hook: Callable[[RiseClipseMetrics], None]) -> None:
+        """
+        Remove a function added with :py:meth:`add_metrics_hook`.
+        
+        Args:
+            hook: The function.
+        """
+        self.metrics_hooks.remove(hook)
+    
+    def get_last_metrics(self) -> RiseClipseMetrics:
+        """
+        Returns the measures of the last validation.
+        
+        Returns:
+            The measures, or None if no validation has ended.
+        """
+        return self.last_metrics
+    
+    def _finish_metrics(self, metrics: RiseClipseMetrics, result_code: int) -> None:
+        """
+        Ends the measures of a validation and gives them to the hooks.
+        """
+        metrics.finish(result_code)
+        self.last_metrics = metrics
+        for hook in self.metrics_hooks:
+            hook(metrics)
+    
+    def _parse_output(self, stdout: str | list[str], metrics: RiseClipseMetrics) -> RiseClipseOutput:
+        """
+        Parses the output of the validator, the time taken and the number of messages of each severity
+        are set in the measures.
+        """
+        start = time.perf_counter()
+        output = RiseClipseOutput(stdout.split('\n') if isinstance(stdout, str) else stdout)
+        self._count_messages(output, metrics, time.perf_counter() - start)
+        return output
+    
+    def _count_messages(self, output: RiseClipseOutput, metrics: RiseClipseMetrics, parse_time: float) -> None:
+        """
+        Sets in the measures the parse time and the number of messages of each severity of the output.
+        """
+        metrics.set_messages(parse_time, {severity: len(positions)
+                                          for severity, positions in output.get_positions_by("severity").items()})
+    
     def _add_option(self, opt: str, value: str=None) -> None:
         """
         Add an option to the command line. An associated value may be specified.
@@ -213,11 +330,160 @@ class RiseClipseValidator(JavaRunner) :
         """
         Runs the validator with the current set of arguments and files.
         
+        If a cache is set (see :py:meth:`set_cache`) and holds the result of the same validation,
+        it is returned without running the validator. The result of a validator which did not end
+        normally (killed, or stopped with a non-zero result code without any message, such as a JVM
+        which could not start) is not put in the cache.
+        
         Returns:
             An object representing the result of validation.
         """
+        metrics = RiseClipseMetrics("validate", self.jar_file)
         arguments = self._compute_arguments(display_copyright=False, use_format=False)
-        return RiseClipseOutput(self.run(arguments).split('\n'))
+        if self.cache is None:
+            output = self._parse_output(self.run(arguments, metrics), metrics)
+            self._finish_metrics(metrics, self.result_code)
+            return output
+        
+        key = self.cache.compute_key(self, arguments)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.result_code, messages = entry
+            output = RiseClipseOutput.from_messages(messages)
+            metrics.cached = True
+            self._count_messages(output, metrics, 0.0)
+            self._finish_metrics(metrics, self.result_code)
+            return output
+        output = self._parse_output(self.run(arguments, metrics), metrics)
+        messages = output.get_all_messages()
+        if self.result_code >= 0 and (self.result_code == 0 or len(messages) > 0):
+            self.cache.put(key, self.result_code, messages)
+        self._finish_metrics(metrics, self.result_code)
+        return output
+    
+    async def validate_async(self, timeout: float=None) -> RiseClipseOutput:
+        """
+        Runs the validator with the current set of arguments and files without blocking
+        the ``asyncio`` event loop.
+        
+        Cancelling the task awaiting this method, or reaching the timeout, kills the validator.
+        See :py:class:`~async_java_runner.AsyncJavaRunner` to limit the number of concurrent validations.
+        
+        Args:
+            timeout: The maximum duration of the validation in seconds, None for no limit.
+        
+        Raises:
+            TimeoutError: If the validation lasted more than ``timeout``.
+        
+        Returns:
+            An object representing the result of validation.
+        """
+        metrics = RiseClipseMetrics("validate_async", self.jar_file)
+        arguments = self._compute_arguments(display_copyright=False, use_format=False)
+        output = self._parse_output(await self.run_async(arguments, timeout, metrics), metrics)
+        self._finish_metrics(metrics, self.result_code)
+        return output
+    
+    def validate_iter(self) -> Iterator[RiseClipseMessage]:
+        """
+        Runs the validator with the current set of arguments and files.
+        Messages are parsed and yielded while the validator runs, so that the first ones
+        are available quickly and the whole output is never kept in memory.
+        
+        Example:
+            Stop at the first error::
+            
+                for message in validator.validate_iter():
+                    if message["severity"] == "ERROR":
+                        print(message["data"])
+                        break
+        
+        The result code is available when all messages have been read. If the iteration is
+        stopped before, the validator is stopped.
+        
+        Returns:
+            An iterator over the parsed messages, see :py:class:`~riseclipse_parser.RiseClipseParser`
+            for their format.
+        """
+        arguments = self._compute_arguments(display_copyright=False, use_format=False)
+        return self._iter_messages(arguments)
+    
+    def _iter_messages(self, arguments: list[str]) -> Iterator[RiseClipseMessage]:
+        """
+        Parses and yields the messages of :py:meth:`validate_iter`, the measures are given to the hooks
+        when the iteration ends, even if it is stopped before the end of the validator.
+        """
+        metrics = RiseClipseMetrics("validate_iter", self.jar_file)
+        parser = RiseClipseParser()
+        clock = time.perf_counter
+        parse_time = 0.0
+        counts = {}
+        done = False
+        try:
+            for line in self.run_iter(arguments, metrics):
+                if len(line) > 0:
+                    start = clock()
+                    message = parser.parse_message(line)
+                    parse_time += clock() - start
+                    counts[message.severity] = counts.get(message.severity, 0) + 1
+                    yield message
+            done = True
+        finally:
+            metrics.set_messages(parse_time, counts)
+            self._finish_metrics(metrics, self.result_code if done else None)
+    
+    def validate_batch(self, files: list[str], workers: int=None) -> RiseClipseOutput:
+        """
+        Validates the given files using several validator processes running concurrently.
+        
+        The files are shared out between ``workers`` executions of the validator. Each execution
+        uses the current set of arguments and the files added with :py:meth:`add_file` (for example
+        NSD and OCL directories) followed by its share of the given files.
+        Messages of all executions are gathered in one result, the ``filename`` field of each message
+        tells which file it comes from.
+        
+        Example:
+            Validate all SCD files of a directory with 8 processes::
+            
+                validator.add_file("NSD")
+                validator.add_file("OCL")
+                out = validator.validate_batch([str(p) for p in Path("scd").glob("*.scd")], workers=8)
+        
+        Note:
+            Each process loads NSD and OCL files, memory needed grows with the number of workers.
+            If a worker pool is used (see :py:meth:`~java_runner.JavaRunner.set_worker_pool`),
+            the number of concurrent executions is also limited by the size of the pool.
+        
+        Args:
+            files: The files to be validated.
+            workers: The number of concurrent executions, the number of CPUs if None.
+        
+        Returns:
+            An object representing the result of validation of all files.
+            The result code is the first negative one (an execution killed by a signal) if any,
+            otherwise the highest one of all executions.
+        """
+        if workers is None:
+            workers = cpu_count() or 1
+        shards = [files[i::workers] for i in range(min(workers, len(files)))]
+        if len(shards) == 0:
+            return self.validate()
+        metrics = RiseClipseMetrics("validate_batch", self.jar_file)
+        arguments = self._compute_arguments(display_copyright=False, use_format=False)
+        
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            results = list(executor.map(lambda shard: self._execute(arguments + shard, metrics), shards))
+        
+        codes = [code for _, code in results]
+        # the files of a killed execution were not all validated, whatever the others found
+        self.result_code = next((code for code in codes if code < 0), max(codes))
+        messages = []
+        for stdout, _ in results:
+            messages.extend(stdout.split('\n'))
+        output = self._parse_output(messages, metrics)
+        self._finish_metrics(metrics, self.result_code)
+        return output
     
     def validate_to_str(self) -> str:
         """
@@ -226,38 +492,111 @@ class RiseClipseValidator(JavaRunner) :
         Returns:
             The result of validation as a string.
         """
+        metrics = RiseClipseMetrics("validate_to_str", self.jar_file)
         arguments = self._compute_arguments()
-        return self.run(arguments)
+        stdout = self.run(arguments, metrics)
+        self._finish_metrics(metrics, self.result_code)
+        return stdout
     
     def validate_to_stdout(self) -> None:
         """
         Runs the validator with the current set of arguments and files.
         Display the result on stdout.
         """
+        metrics = RiseClipseMetrics("validate_to_stdout", self.jar_file)
         arguments = self._compute_arguments(set_color=True)
-        print(self.run(arguments))
+        print(self.run(arguments, metrics))
+        self._finish_metrics(metrics, self.result_code)
 
     def validate_to_txt(self, outputFile: str="riseclipse_output.txt") -> None:
         """
         Runs the validator with the current set of arguments and files.
         Save the result in the given file.
         
+        The output of the validator is written directly to the file, it is never held in memory.
+        Use :py:meth:`~riseclipse_output.RiseClipseOutput.from_file` to read it.
+        
         Args:
             outputFile: The path to the file where the result will be saved.
         """
+        metrics = RiseClipseMetrics("validate_to_txt", self.jar_file)
         arguments = self._compute_arguments()
-        result = self.run(arguments)
-        output_file = open(outputFile, "w")
-        output_file.write(result)
-        output_file.close()
+        self.run_to_file(arguments, outputFile, metrics)
+        self._finish_metrics(metrics, self.result_code)
 
     def get_current_version(self) -> list[int]:
         """
         Returns the current version of the ``jar`` file used by this object.
         
+        The version is read from the manifest (``Implementation-Version`` or ``Bundle-Version``)
+        or from the ``pom.properties`` of the validator in the ``jar``, without starting Java.
+        Only if none is found, the ``jar`` is run with ``--help`` to read the version it displays.
+        The result is remembered until the ``jar`` file changes.
+        
         Returns:
             A list of three integers giving the current version.
         """
+        try:
+            stat = os.stat(self.jar_file)
+            identity = (os.path.abspath(self.jar_file), stat.st_size, stat.st_mtime_ns)
+        except (OSError, TypeError):
+            identity = None
+        if identity is not None and identity in _jar_versions:
+            return list(_jar_versions[identity])
+        version = self._read_jar_version()
+        if version is None:
+            version = self._probe_version()
+        if identity is not None:
+            _jar_versions[identity] = list(version)
+        return version
+
+    def _read_jar_version(self) -> list[int]:
+        """
+        Returns the version found in the metadata of the ``jar`` file, or None.
+
+        Note:
+            This method is intended to be internal
+        """
+        from zipfile import BadZipFile, ZipFile
+        try:
+            with ZipFile(self.jar_file) as jar:
+                names = jar.namelist()
+                manifest = ""
+                if "META-INF/MANIFEST.MF" in names:
+                    manifest = jar.read("META-INF/MANIFEST.MF").decode("utf-8", "replace")
+                # a fat jar also contains the pom.properties of its dependencies
+                properties = [jar.read(name).decode("utf-8", "replace") for name in names
+                              if name.startswith("META-INF/maven/") and name.endswith("/pom.properties")]
+        except (OSError, BadZipFile, TypeError):
+            return None
+
+        # continuation lines start with a single space
+        manifest = manifest.replace("\r\n", "\n").replace("\n ", "")
+        for key in ("Implementation-Version:", "Bundle-Version:"):
+            for line in manifest.split('\n'):
+                if line.startswith(key):
+                    match = _VERSION_PATTERN.match(line[len(key):].strip())
+                    if match:
+                        return [int(n) for n in match.groups()]
+
+        versions = set()
+        for content in properties:
+            values = dict(line.split('=', 1) for line in content.splitlines() if '=' in line and not line.startswith('#'))
+            if "riseclipse" in values.get("groupId", "") and "validator" in values.get("artifactId", "").lower():
+                match = _VERSION_PATTERN.match(values.get("version", "").strip())
+                if match:
+                    versions.add(tuple(int(n) for n in match.groups()))
+        if len(versions) == 1:
+            return list(versions.pop())
+        return None
+
+    def _probe_version(self) -> list[int]:
+        """
+        Returns the version displayed by the ``jar`` file with ``--help``.
+
+        Note:
+            This method is intended to be internal
+        """
         copyright = self.run(["--help"]).split('\n')[16]
         version_pos = copyright.find("version: ")
         version = copyright[version_pos + len("version: "):]
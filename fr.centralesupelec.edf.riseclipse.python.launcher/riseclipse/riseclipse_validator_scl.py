@@ -21,7 +21,6 @@ from pathlib import Path
 from sys import argv
 
 from riseclipse_validator import RiseClipseValidator
-from riseclipse_download import RiseClipseDownload
 
 
 RISECLIPSE_VALIDATOR_SCL_JAR = "RiseClipseValidatorSCL.jar"
@@ -124,6 +123,9 @@ class RiseClipseValidatorSCL(RiseClipseValidator) :
 
 
 if __name__ == '__main__':
+    from riseclipse_download import RiseClipseDownload
+    from riseclipse_metadata import RiseClipseMetadataCache
+
     if len(argv) == 1:
         jar = Path(RISECLIPSE_VALIDATOR_SCL_JAR)
         
@@ -132,11 +134,17 @@ if __name__ == '__main__':
             print("You can download one using '--download latest' command line option (or use a specific version instead of latest).")
             exit(0)
         
-        validator = RiseClipseValidatorSCL()
-        current_version = validator.get_current_version()
-        download = RiseClipseDownload()
+        # versions are remembered so that checking again needs neither Java nor the network
+        metadata = RiseClipseMetadataCache()
+        current_version = metadata.get_jar_version(RISECLIPSE_VALIDATOR_SCL_JAR)
+        if current_version is None:
+            current_version = RiseClipseValidatorSCL().get_current_version()
+            metadata.put_jar_version(RISECLIPSE_VALIDATOR_SCL_JAR, current_version)
+        download = RiseClipseDownload(metadata=metadata)
         print("Your version is: %d.%d.%d" % (current_version[0], current_version[1], current_version[2]))
         latest_version = download.get_latest_version("riseclipse-validator-scl2003")
+        if latest_version is None:
+            exit()
         if current_version < latest_version:
             print("A new version is available: %d.%d.%d" % (latest_version[0], latest_version[1], latest_version[2]))
             print("You can download it using '--download latest' command line option")
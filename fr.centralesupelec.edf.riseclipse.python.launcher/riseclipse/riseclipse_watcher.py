@@ -0,0 +1,232 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import os
+from os import cpu_count
+from threading import Event
+from typing import Callable
+
+from riseclipse_output import RiseClipseOutput
+from riseclipse_parser import RiseClipseParser
+
+
+SCL_EXTENSIONS = (".scd", ".icd", ".cid", ".iid", ".ssd", ".sed", ".scl")
+
+
+class RiseClipseWatcher:
+    """
+    Watches the files and directories given to a validator with
+    :py:meth:`~riseclipse_validator.RiseClipseValidator.add_file` and validates again
+    only the SCL files which have changed.
+
+    SCL files (recognized by their extension) are validated one by one, with the other files
+    and directories (NSD, OCL...) shared by all validations. When a shared file changes, all SCL
+    files are validated again. Changes are detected by polling the modification time and size of files,
+    hidden files and editor backup files (ending with ``~``) are ignored.
+
+    The messages are gathered in one :py:class:`~riseclipse_output.RiseClipseOutput` which is updated
+    in place: messages of unchanged files are kept, those of changed files are replaced.
+    If the validation of an SCL file fails (the validator can't be started, or its output can't be parsed),
+    the file has no messages, its result code is None, and the exception is kept in ``errors``; the other
+    files are still validated and watching goes on.
+
+    Example:
+        Display errors each time an SCD file is saved::
+
+            validator = RiseClipseValidatorSCL()
+            validator.add_file("project")       # contains SCD files
+            validator.add_file("NSD")
+            watcher = RiseClipseWatcher(validator)
+            watcher.watch(lambda output, changed: print(output.get_errors()))
+
+    Attributes:
+        validator (RiseClipseValidator): The validator used, with its current options.
+        interval (float): The time between two polls, in seconds.
+        workers (int): The maximum number of validations running at the same time.
+        output (RiseClipseOutput): The live result of validation.
+        result_codes (dict[str, int]): The result code of the last validation of each SCL file.
+        errors (dict[str, Exception]): The exception raised by the last validation of each SCL file which failed.
+    """
+
+    def __init__(self, validator: "RiseClipseValidator", interval: float=1.0, workers: int=None):
+        """
+        Initialize the RiseClipseWatcher object, nothing is validated yet.
+
+        Args:
+            validator: The validator used, with its current options and files.
+            interval: The time between two polls, in seconds.
+            workers: The maximum number of validations running at the same time, the number of CPUs if None.
+        """
+        self.validator = validator
+        self.interval = interval
+        self.workers = workers or cpu_count() or 1
+        self.output = RiseClipseOutput.from_messages([])
+        self.result_codes = {}
+        self.errors = {}
+        # (modification time, size) of each watched file
+        self.states = {}
+        # messages of the last validation of each SCL file
+        self.messages_by_file = {}
+
+    def start(self) -> RiseClipseOutput:
+        """
+        Validates all SCL files and records the state of all watched files.
+
+        Returns:
+            The live result of validation.
+        """
+        self.states = self._scan()
+        self.messages_by_file = {}
+        self._validate(self._get_scl_files(self.states))
+        return self.output
+
+    def poll(self) -> list[str]:
+        """
+        Validates again the SCL files which have changed since the last call, or all of them
+        if a shared file has changed. Messages of removed SCL files are removed.
+
+        Returns:
+            The SCL files which have been validated, or removed.
+        """
+        states = self._scan()
+        changed = [path for path in states if self.states.get(path) != states[path]]
+        changed.extend(path for path in self.states if path not in states)
+        self.states = states
+        if len(changed) == 0:
+            return []
+
+        scl_files = self._get_scl_files(states)
+        if any(not self._is_scl_file(path) for path in changed):
+            to_validate = scl_files
+        else:
+            to_validate = [path for path in changed if path in states]
+        removed = [path for path in self.messages_by_file if path not in states]
+        for path in removed:
+            del self.messages_by_file[path]
+            self.result_codes.pop(path, None)
+            self.errors.pop(path, None)
+        self._validate(to_validate)
+        return to_validate + removed
+
+    def watch(self, callback: Callable[[RiseClipseOutput, list[str]], None]=None, stop: Event=None) -> None:
+        """
+        Validates all SCL files, then polls every ``interval`` seconds until ``stop`` is set.
+
+        Args:
+            callback: Called with the live output and the list of changed files after each
+                validation, including the first one.
+            stop: The event ending the loop, if None the loop never ends.
+        """
+        stop = stop or Event()
+        self.start()
+        if callback is not None:
+            callback(self.output, sorted(self.messages_by_file))
+        while not stop.wait(self.interval):
+            changed = self.poll()
+            if len(changed) > 0 and callback is not None:
+                callback(self.output, changed)
+
+    def _validate(self, scl_files: list[str]) -> None:
+        """
+        Validates the given SCL files and updates the live output.
+        """
+        if len(scl_files) > 0:
+            shared = self._get_shared_arguments()
+            arguments = self.validator._compute_arguments(display_copyright=False, use_format=False)
+            # the files given to the validator are replaced by the shared ones and one SCL file
+            arguments = arguments[:len(arguments) - len(self.validator.files)] + shared
+
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(scl_files))) as executor:
+                results = list(executor.map(lambda file: self._validate_file(arguments + [file]), scl_files))
+            for file, (messages, result_code, error) in zip(scl_files, results):
+                self.messages_by_file[file] = messages
+                self.result_codes[file] = result_code
+                if error is None:
+                    self.errors.pop(file, None)
+                else:
+                    self.errors[file] = error
+
+        messages = []
+        for file in sorted(self.messages_by_file):
+            messages.extend(self.messages_by_file[file])
+        self.output.set_messages(messages)
+
+    def _validate_file(self, arguments: list[str]) -> tuple[list["RiseClipseMessage"], int, Exception]:
+        """
+        Executes the validator with the given arguments and parses its output.
+
+        Returns:
+            The messages, the result code and None, or no message, None and the exception
+            if the validation failed.
+        """
+        try:
+            stdout, result_code = self.validator._execute(arguments)
+            return list(RiseClipseParser().iter_parse(stdout.split('\n'))), result_code, None
+        except Exception as e:
+            return [], None, e
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """
+        Returns the modification time and size of all watched files.
+        """
+        states = {}
+        for entry in self.validator.files:
+            if os.path.isdir(entry):
+                for root, directories, files in os.walk(entry):
+                    for name in files:
+                        self._add_state(states, os.path.join(root, name))
+            else:
+                self._add_state(states, entry)
+        return states
+
+    def _add_state(self, states: dict[str, tuple[int, int]], path: str) -> None:
+        name = os.path.basename(path)
+        # hidden and backup files of editors are not watched, as the validator ignores the former
+        if name.endswith('~') or (name.startswith('.')
+                                  and "--use-filenames-starting-with-dot" not in self.validator.options):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        states[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def _is_scl_file(self, path: str) -> bool:
+        return path.lower().endswith(SCL_EXTENSIONS)
+
+    def _get_scl_files(self, states: dict[str, tuple[int, int]]) -> list[str]:
+        return sorted(path for path in states if self._is_scl_file(path))
+
+    def _get_shared_arguments(self) -> list[str]:
+        """
+        Returns the files and directories given to the validator which are not SCL files;
+        directories containing SCL files are replaced by their other files.
+        """
+        shared = []
+        for entry in self.validator.files:
+            if os.path.isdir(entry):
+                files = [path for path in self.states if path.startswith(os.path.join(entry, ''))]
+                if any(self._is_scl_file(path) for path in files):
+                    shared.extend(sorted(path for path in files if not self._is_scl_file(path)))
+                else:
+                    shared.append(entry)
+            elif not self._is_scl_file(entry):
+                shared.append(entry)
+        return shared
@@ -0,0 +1,119 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+import csv
+import gzip
+import json
+from typing import Iterable, Mapping
+
+
+# Same order of columns as RiseClipseOutput.to_csv()
+CSV_COLUMNS = ("category", "line", "data", "filename", "severity", "message")
+
+
+class RiseClipseWriter:
+    """
+    A class used to write parsed messages to a file as they come, so that the whole set of
+    messages never needs to be in memory.
+
+    Two formats are available:
+
+    * ``"csv"``: a header line followed by one line per message, fields containing the separator,
+      quotes or newlines are quoted
+    * ``"jsonl"``: one JSON object per line (JSON Lines / NDJSON)
+
+    Example:
+        Save the messages while the validator runs::
+
+            with RiseClipseWriter("result.jsonl.gz", format="jsonl") as writer:
+                writer.write_all(validator.validate_iter())
+
+    Attributes:
+        path (str): The path of the file.
+        format (str): The format of the file, ``"csv"`` or ``"jsonl"``.
+        count (int): The number of messages written.
+    """
+
+    def __init__(self, path: str, format: str="csv", separator: str=",", compress: bool=None):
+        """
+        Open the file and, for CSV, write the header.
+
+        Args:
+            path: The path of the file.
+            format: ``"csv"`` or ``"jsonl"``.
+            separator: The separator used in the CSV file.
+            compress: Whether the file is compressed with gzip. If None, the file is compressed
+                when its name ends with ``.gz``.
+        """
+        if format not in ("csv", "jsonl"):
+            raise ValueError("Unknown format: " + format)
+        if compress is None:
+            compress = path.endswith(".gz")
+        self.path = path
+        self.format = format
+        self.count = 0
+        if compress:
+            self.file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="")
+        if format == "csv":
+            self.csv_writer = csv.writer(self.file, delimiter=separator, lineterminator="\n")
+            self.csv_writer.writerow(CSV_COLUMNS)
+
+    def write(self, message: Mapping) -> None:
+        """
+        Write one parsed message.
+
+        Args:
+            message: The message, a :py:class:`~riseclipse_message.RiseClipseMessage` or a dictionary with the same keys.
+        """
+        if self.format == "csv":
+            self.csv_writer.writerow([message[column] for column in CSV_COLUMNS])
+        else:
+            self.file.write(json.dumps(dict(message)))
+            self.file.write("\n")
+        self.count += 1
+
+    def write_all(self, messages: Iterable[Mapping]) -> int:
+        """
+        Write all the given messages, they are consumed one at a time.
+
+        Args:
+            messages: The messages, for example :py:meth:`~riseclipse_output.RiseClipseOutput.get_all_messages`
+                or :py:meth:`~riseclipse_validator.RiseClipseValidator.validate_iter`.
+
+        Returns:
+            The number of messages written.
+        """
+        written = self.count
+        for message in messages:
+            self.write(message)
+        return self.count - written
+
+    def close(self) -> None:
+        """
+        Close the file.
+        """
+        self.file.close()
+
+    def __enter__(self) -> "RiseClipseWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
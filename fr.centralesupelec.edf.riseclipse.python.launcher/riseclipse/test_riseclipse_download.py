@@ -0,0 +1,170 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Tests of the resumption of downloads against a local stand-in for GitHub, without network::
+
+    python -m unittest test_riseclipse_download
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from riseclipse_download import RiseClipseDownload
+
+REPOSITORY = 'riseclipse-validator-scl2003'
+NAME = 'RiseClipseValidatorSCL'
+PATH = '/%s/releases/download/%s-1.2.7/%s-1.2.7.jar' % (REPOSITORY, REPOSITORY, NAME)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves ``server.content`` at ``PATH`` with its ``server.etag``, supporting ``Range`` and ``If-Range``;
+    the connection is cut after ``server.cut`` bytes when it is not None, and ``Content-Length``
+    is only sent if ``server.send_length`` is True.
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.path != PATH:
+            self.send_error(404)
+            return
+        content = server.content
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header is not None and self.headers.get('If-Range') in (None, server.etag):
+            start = int(range_header[len('bytes='):].rstrip('-'))
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */%d' % len(content))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, len(content) - 1, len(content)))
+        else:
+            self.send_response(200)
+        body = content[start:]
+        if server.send_length:
+            self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', server.etag)
+        self.end_headers()
+        if server.cut is not None:
+            body = body[:server.cut]
+            server.cut = None
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRiseClipseDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.server.content = os.urandom(300 * 1024)
+        self.server.etag = '"v1"'
+        self.server.cut = None
+        self.server.send_length = True
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'validator.jar')
+        base_url = 'http://127.0.0.1:%d/' % self.server.server_address[1]
+        self.download = RiseClipseDownload(base_url=base_url, retries=2, backoff=0.0, timeout=5.0)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def get(self, sha256: str=None) -> bool:
+        return self.download.download_version(REPOSITORY, NAME, [1, 2, 7], self.output, sha256=sha256)
+
+    def assertDownloaded(self):
+        with open(self.output, 'rb') as f:
+            self.assertEqual(f.read(), self.server.content)
+        self.assertFalse(os.path.exists(self.output + '.part'))
+        self.assertFalse(os.path.exists(self.output + '.part.json'))
+
+    def test_download(self):
+        sha256 = hashlib.sha256(self.server.content).hexdigest()
+        self.assertTrue(self.get(sha256))
+        self.assertDownloaded()
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_resume_after_cut(self):
+        self.server.cut = 100 * 1024
+        self.assertTrue(self.get())
+        self.assertDownloaded()
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1].get('Range'), 'bytes=%d-' % (100 * 1024))
+        self.assertEqual(self.server.requests[1].get('If-Range'), '"v1"')
+
+    def test_changed_file_is_not_spliced(self):
+        self.server.cut = 100 * 1024
+        self.download.retries = 0
+        self.assertFalse(self.get())
+        self.server.content = os.urandom(300 * 1024)
+        self.server.etag = '"v2"'
+        self.download.retries = 2
+        self.assertTrue(self.get())
+        self.assertDownloaded()
+
+    def test_partial_of_another_url_is_not_resumed(self):
+        with open(self.output + '.part', 'wb') as f:
+            f.write(b'x' * 1024)
+        self.assertTrue(self.get())
+        self.assertDownloaded()
+        self.assertNotIn('Range', self.server.requests[0])
+
+    def test_partial_too_long_restarts(self):
+        self.server.cut = 100 * 1024
+        self.download.retries = 0
+        self.assertFalse(self.get())
+        with open(self.output + '.part', 'ab') as f:
+            f.write(b'x' * 300 * 1024)
+        self.download.retries = 2
+        self.assertTrue(self.get())
+        self.assertDownloaded()
+
+    def test_unknown_length_needs_sha256(self):
+        self.server.send_length = False
+        self.server.cut = 100 * 1024
+        self.assertFalse(self.get())
+        self.assertFalse(os.path.exists(self.output))
+        self.assertTrue(os.path.exists(self.output + '.part'))
+        sha256 = hashlib.sha256(self.server.content).hexdigest()
+        self.assertTrue(self.get(sha256))
+        self.assertDownloaded()
+
+    def test_sha256_mismatch(self):
+        self.assertFalse(self.get('0' * 64))
+        self.assertFalse(os.path.exists(self.output))
+        self.assertFalse(os.path.exists(self.output + '.part'))
+        self.assertFalse(os.path.exists(self.output + '.part.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
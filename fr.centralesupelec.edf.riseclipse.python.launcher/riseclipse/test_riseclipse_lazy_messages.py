@@ -0,0 +1,90 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Tests that lazy outputs give the same messages as outputs parsed at once::
+
+    python -m unittest test_riseclipse_lazy_messages
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+from riseclipse_output import RiseClipseOutput
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+from synthetic_output import generate_output
+
+# Lines whose first 8 characters are not a severity padded with spaces
+UNUSUAL_LINES = (
+    'ERROR: [OCL] short padding (IED_1.icd:1)',
+    'FATAL   : [OCL] unknown severity (IED_1.icd:2)',
+    'WARN[x] : [OCL] bracket in the severity (IED_1.icd:3)',
+    '  INFO  : [OCL] leading spaces (IED_1.icd:4)',
+    'NOTICE  : location before category (IED_1.icd:5) [OCL]',
+    'WARNING:[OCL] no space (IED_1.icd:6)',
+)
+
+
+class TestRiseClipseLazyMessages(unittest.TestCase):
+
+    def setUp(self):
+        lines = generate_output(500, irregular=0.3, seed=1).split('\n')
+        # unusual lines among regular ones
+        for i, line in enumerate(UNUSUAL_LINES):
+            lines.insert(i * 50, line)
+        self.text = '\n'.join(lines)
+
+    def assertSameMessages(self, output: RiseClipseOutput, lazy: RiseClipseOutput):
+        self.assertEqual(lazy.get_positions_by("severity"), output.get_positions_by("severity"))
+        for getter in ("get_errors", "get_warnings", "get_notices", "get_infos", "get_only_warnings"):
+            self.assertEqual([m.message for m in getattr(lazy, getter)()],
+                             [m.message for m in getattr(output, getter)()], getter)
+        self.assertEqual([dict(m) for m in lazy.get_all_messages()], [dict(m) for m in output.get_all_messages()])
+
+    def test_lazy_output(self):
+        self.assertSameMessages(RiseClipseOutput(self.text), RiseClipseOutput(self.text, lazy=True))
+
+    def test_file_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'output.txt')
+            with open(path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(self.text)
+            lazy = RiseClipseOutput.from_file(path, encoding='utf-8')
+            self.assertSameMessages(RiseClipseOutput(self.text), lazy)
+            lazy.parsed_messages.close()
+
+    def test_unusual_severities(self):
+        lazy = RiseClipseOutput('\n'.join(UNUSUAL_LINES), lazy=True).parsed_messages
+        severities = [lazy.get_severity(i) for i in range(len(UNUSUAL_LINES))]
+        self.assertEqual(severities, [RiseClipseOutput(line).get_all_messages()[0].severity for line in UNUSUAL_LINES])
+
+    def test_malformed_line(self):
+        line = 'ERROR   : neither category nor location'
+        with self.assertRaises(ValueError):
+            RiseClipseOutput(line)
+        lazy = RiseClipseOutput(line, lazy=True)
+        with self.assertRaises(ValueError):
+            lazy.get_all_messages()[0]
+
+
+if __name__ == '__main__':
+    unittest.main()
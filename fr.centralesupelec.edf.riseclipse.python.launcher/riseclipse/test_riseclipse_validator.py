@@ -0,0 +1,135 @@
+# *************************************************************************
+# **  Copyright (c) 2024 CentraleSupélec & EDF.
+# **  All rights reserved. This program and the accompanying materials
+# **  are made available under the terms of the Eclipse Public License v2.0
+# **  which accompanies this distribution, and is available at
+# **  https://www.eclipse.org/legal/epl-v20.html
+# **
+# **  This file is part of the RiseClipse tool
+# **
+# **  Contributors:
+# **      Computer Science Department, CentraleSupélec
+# **      EDF R&D
+# **  Contacts:
+# **      dominique.marcadet@centralesupelec.fr
+# **      aurelie.dehouck-neveu@edf.fr
+# **  Web site:
+# **      https://riseclipse.github.io
+# *************************************************************************
+
+"""
+Tests of the validator with the ``fake_java`` of the benchmarks standing for ``java``, without a JDK::
+
+    python -m unittest test_riseclipse_validator
+"""
+
+import os
+import signal
+import tempfile
+import unittest
+from unittest import mock
+from zipfile import ZipFile
+
+from java_worker_pool import JavaWorkerPool
+from riseclipse_cache import RiseClipseCache
+from riseclipse_validator_scl import RiseClipseValidatorSCL
+
+FAKE_JAVA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks', 'fake_java')
+
+
+@unittest.skipIf(os.name == 'nt', "fake_java is a script")
+class TestRiseClipseValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        jar_file = os.path.join(self.directory.name, 'validator.jar')
+        with ZipFile(jar_file, 'w') as jar:
+            jar.writestr('META-INF/MANIFEST.MF', 'Main-Class: fr.centralesupelec.edf.riseclipse.Validator\n')
+        self.validator = RiseClipseValidatorSCL()
+        self.validator.set_java_command(FAKE_JAVA)
+        self.validator.set_jar_file(jar_file)
+        self.files = []
+        for i in range(4):
+            path = os.path.join(self.directory.name, 'IED_%d.icd' % i)
+            with open(path, 'w') as f:
+                f.write('<SCL/>')
+            self.files.append(path)
+        self.environment = mock.patch.dict(os.environ, {'RISECLIPSE_FAKE_MESSAGES': '10'})
+        self.environment.start()
+
+    def tearDown(self):
+        self.environment.stop()
+        self.directory.cleanup()
+
+    def test_batch_result_code(self):
+        os.environ['RISECLIPSE_FAKE_RESULT'] = '1'
+        self.validator.validate_batch(self.files, workers=2)
+        self.assertEqual(self.validator.get_result_code(), 1)
+
+    def test_batch_with_killed_shard(self):
+        os.environ['RISECLIPSE_FAKE_KILL'] = self.files[1]
+        output = self.validator.validate_batch(self.files, workers=2)
+        self.assertEqual(self.validator.get_result_code(), -signal.SIGKILL)
+        # the output of the other shard and what the killed one displayed are kept
+        self.assertEqual(len(output.get_all_messages()), 20)
+
+    def validate_with_cache(self) -> bool:
+        """
+        Validates the first file with a cache, returns whether the result was taken from it.
+        """
+        self.validator.add_file(self.files[0])
+        self.validator.set_cache(RiseClipseCache(os.path.join(self.directory.name, 'cache')))
+        self.validator.validate()
+        return self.validator.get_last_metrics().cached
+
+    def test_result_is_cached(self):
+        self.assertFalse(self.validate_with_cache())
+        self.assertEqual(len(self.validator.validate().get_all_messages()), 10)
+        self.assertTrue(self.validator.get_last_metrics().cached)
+
+    def test_killed_validator_is_not_cached(self):
+        os.environ['RISECLIPSE_FAKE_KILL'] = self.files[0]
+        self.assertFalse(self.validate_with_cache())
+        del os.environ['RISECLIPSE_FAKE_KILL']
+        self.validator.validate()
+        self.assertFalse(self.validator.get_last_metrics().cached)
+        self.assertEqual(self.validator.get_result_code(), 0)
+
+    def test_failed_start_is_not_cached(self):
+        os.environ['RISECLIPSE_FAKE_MESSAGES'] = '0'
+        os.environ['RISECLIPSE_FAKE_RESULT'] = '1'
+        self.assertFalse(self.validate_with_cache())
+        self.validator.validate()
+        self.assertFalse(self.validator.get_last_metrics().cached)
+
+    def validate_with_pool(self) -> int:
+        """
+        Validates the first file with a worker pool, returns the number of workers started.
+        """
+        pool = JavaWorkerPool(size=1)
+        self.validator.set_worker_pool(pool)
+        self.validator.add_file(self.files[0])
+        try:
+            self.assertEqual(len(self.validator.validate().get_all_messages()), 10)
+            return pool.get_worker_count()
+        finally:
+            pool.close()
+
+    def test_worker_pool(self):
+        self.assertEqual(self.validate_with_pool(), 1)
+
+    def test_worker_pool_unsupported_jdk(self):
+        java = os.path.join(self.directory.name, 'java')
+        with open(java, 'w') as f:
+            f.write('#!/bin/sh\n'
+                    'if [ "$1" = "-version" ]; then echo \'openjdk version "24" 2025-03-18\' >&2; exit 0; fi\n'
+                    'exec "%s" "$@"\n' % FAKE_JAVA)
+        os.chmod(java, 0o755)
+        self.validator.set_java_command(java)
+        self.assertEqual(self.validator.get_java_version(), 24)
+        # a new JVM is started instead
+        self.assertEqual(self.validate_with_pool(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()